@@ -0,0 +1,48 @@
+import contextlib
+import io
+import timeit
+from typing import Any
+
+from lib.knowledge_base.knowledge_base import KnowledgeBase
+from lib.percepts import Percepts
+
+
+class HookedKnowledgeBase(KnowledgeBase):
+    """
+    KnowledgeBase with the old attribute hook put back, to measure what it cost
+    """
+
+    def __getattribute__(self, __name: str) -> Any:
+        match __name:
+            case "exit" | "safe_cells" | "wumpus_cells" | "pit_cells":
+                return super().__getattribute__(__name)
+            case _:
+                return super().__getattribute__(__name)
+
+
+def bench_access(kb: KnowledgeBase, number: int) -> float:
+    return timeit.timeit(lambda: (kb.world, kb.top, kb.check_oob), number=number)
+
+
+def bench_tell(kb_type: type, number: int) -> float:
+    percepts = Percepts()
+
+    def tell():
+        kb = kb_type()
+        for x in range(-5, 5):
+            kb.tell(x, 0, percepts)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        return timeit.timeit(tell, number=number)
+
+
+if __name__ == "__main__":
+    number = 200_000
+    plain = bench_access(KnowledgeBase(), number) / number / 3 * 1e9
+    hooked = bench_access(HookedKnowledgeBase(), number) / number / 3 * 1e9
+    print(f"attribute read: {plain:.1f} ns plain, {hooked:.1f} ns hooked")
+
+    number = 200
+    plain = bench_tell(KnowledgeBase, number) / number / 10 * 1e6
+    hooked = bench_tell(HookedKnowledgeBase, number) / number / 10 * 1e6
+    print(f"tell: {plain:.1f} us plain, {hooked:.1f} us hooked")
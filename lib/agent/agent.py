@@ -2,6 +2,8 @@ from enum import Enum
 from typing import List, Tuple, Set, Dict
 from lib.game.board_model import Action, Direction
 from lib.game.board_data import TileType
+from lib.agent.frontier import Frontier
+from lib.agent.navigation import Navigation
 from lib.game.board_with_kb import BoardModelWithKB
 from lib.knowledge_base.cell import Cell, CellValue
 from lib.knowledge_base.knowledge_base import KnowledgeBase
@@ -36,12 +38,46 @@ class Agent:
         self.golds = 0
         self.state = AgentState.FIND_GOLD
         self.stack: List[Tuple[int, int]] = [(0, 0)]
+        self.navigation = Navigation(board.kb)
+        self.navigation.update(board.last_changes)
+        self.frontier = Frontier(self.navigation, board.virtual_agent_position())
+        self.frontier.update(board.last_changes)
 
-    def identify_direction(self, room: Tuple[int, int]) -> Direction:
-        x, y = (
-            self.board.virtual_agent_position().x,
-            self.board.virtual_agent_position().y,
+    def snapshot(self) -> tuple:
+        """
+        Mark the agent and its board, to try actions and roll them back with restore
+        """
+        return (
+            self.golds,
+            self.state,
+            list(self.stack),
+            set(self.frontier.visited),
+            self.board.snapshot(),
         )
+
+    def restore(self, snapshot: tuple) -> None:
+        """
+        Roll the agent and its board back to a snapshot.
+
+        The board and the knowledge base undo only what changed since the snapshot,
+        but the navigation and the frontier are rebuilt from the knowledge base, in
+        time that grows with the whole known area.
+        """
+        self.golds, self.state, stack, visited, board = snapshot
+        self.stack = list(stack)
+        self.board.restore(board)
+        self.navigation.rebuild()
+        self.frontier.visited = set(visited)
+        self.frontier.rebuild()
+
+    def release(self) -> None:
+        """
+        Stop recording, the snapshots taken so far cannot be restored anymore
+        """
+        self.board.release()
+
+    def identify_direction(self, room: Tuple[int, int]) -> Direction:
+        x, y = self.board.virtual_agent_position()
         if room == (x, y + 1):
             return Direction.UP
         elif room == (x, y - 1):
@@ -56,7 +92,7 @@ class Agent:
         self,
         find_all: bool = False,
     ) -> List[Tuple[int, int]]:
-        safe_cells: List[Tuple[int, int]] = self.board.kb.__getattribute__("safe_cells")
+        safe_cells: List[Tuple[int, int]] = self.board.kb.safe_cells
         if find_all:
             return safe_cells
         adjacent_rooms = self._adjacent_rooms()
@@ -66,7 +102,7 @@ class Agent:
         self,
         target: CellValue | None = None,
     ) -> Dict[Tuple[int, int], CellValue] | List[Tuple[int, int]]:
-        wumpus_cells = self.board.kb.__getattribute__("wumpus_cells")
+        wumpus_cells = self.board.kb.wumpus_cells
         converted = self._convert(wumpus_cells)
         if target in (CellValue.TRUE, CellValue.MAYBE):
             return [room for room in converted if converted[room] == target]
@@ -76,7 +112,7 @@ class Agent:
         self,
         target: CellValue | None = None,
     ) -> List[Tuple[Tuple[int, int], CellValue]] | List[Tuple[int, int]]:
-        pit_cells = self.board.kb.__getattribute__("pit_cells")
+        pit_cells = self.board.kb.pit_cells
         converted = self._convert(pit_cells)
         if target in (CellValue.TRUE, CellValue.MAYBE):
             return [room for room in converted if converted[room] == target]
@@ -103,7 +139,7 @@ class Agent:
     def exit_room(self) -> Tuple[int, int] | None:
         _, bottom, left, _ = self.board.known_bounds()
         if bottom is not None and left is not None:
-            return self.board.kb.__getattribute__("exit")
+            return self.board.kb.exit
         return None
 
     def backtrack(self) -> Tuple[int, int] | None:
@@ -119,10 +155,7 @@ class Agent:
         return self.stack[-1]
 
     def _adjacent_rooms(self) -> Set[Tuple[int, int]]:
-        x, y = (
-            self.board.virtual_agent_position().x,
-            self.board.virtual_agent_position().y,
-        )
+        x, y = self.board.virtual_agent_position()
         top, bottom, left, right = self.board.known_bounds()
         res = set()
         if top is None or y < top:
@@ -179,13 +212,17 @@ class Agent:
         direction = self.board.identify_direction_to_modify(to_room)
         self.board.change_agent_direction(direction)
         percepts = self.board.act(action)
+        self.navigation.update(self.board.last_changes)
+        self.frontier.update(self.board.last_changes)
         top, bottom, left, right = self.board.known_bounds()
         if action == Action.MOVE:
             if self.stack[-1] == to_room:
                 self.stack.pop()
             self.stack.append(to_room)
+            if not percepts.bump:
+                self.frontier.visit(to_room)
         print(f"Known bounds: {top}, {bottom}, {left}, {right}")
-        if percepts["glitter"]:
+        if percepts.glitter:
             self.golds += 1
         # Check the current percepts to see if the agent is still alive
         self._is_alive = not self.board.game_over
@@ -1,11 +1,10 @@
-from copy import deepcopy
 from enum import Enum
 import random
 from typing import Callable, List, Optional, Set, Tuple
 from lib.agent.agent import Agent, AgentState, Decision
 from lib.game.board_model import Action, Direction
 from lib.game.board_with_kb import BoardModelWithKB
-from lib.knowledge_base.cell import CellValue
+from lib.knowledge_base.cell import CellValue, Predicate
 
 from rich import print
 
@@ -14,16 +13,15 @@ from lib.percepts import Percepts
 
 def simulation(
     agent: Agent,
-    visited_rooms: Set[Tuple[int, int]],
     take_risk: bool,
-) -> Tuple[Percepts, Set[Tuple[int, int]]]:
+) -> Percepts:
     print("=====================================")
     # Step 1
-    c_visited_rooms = deepcopy(visited_rooms)
-    safe_rooms = agent.safe_rooms()
     percepts = agent.board.current_percepts
     # Step 2
     if agent.state == AgentState.TRY_TO_EXIT:
+        if (percepts := _walk_to_exit(agent)) is not None:
+            return percepts
         try:  # Try to climb out of the cave
             room = agent.latest_room()
             if room is not None:
@@ -31,67 +29,48 @@ def simulation(
                 print(
                     f"Agent is trying to climb out of the cave. Take action CLIMB to {room}"
                 )
-                return (percepts, c_visited_rooms)
+                return percepts
         except Exception as e:
             print(f"Cannot climb out of the cave")
     # Step 4
-    all_safe_rooms = agent.safe_rooms(find_all=True)
     print(f"Agent stack: {agent.stack}")
-    print(f"Safe rooms has {len(safe_rooms)} rooms: {safe_rooms}")
-    print(f"All safe rooms has {len(set(all_safe_rooms))} rooms")
+    print(f"Frontier has {len(agent.frontier.unvisited)} safe rooms not visited yet")
     if (
-        set(all_safe_rooms).issubset(c_visited_rooms)
+        agent.frontier.is_empty()
         and agent.state != AgentState.TRY_TO_EXIT
-        and percepts["stench"] is None
+        and not percepts.stench
     ):
         print("All safe rooms are visited")
-        print(f"Visited rooms: {c_visited_rooms}")
-        return _restart_to_exit(agent, c_visited_rooms)
-    if (room := _select_room(
-        agent,
-        visited_rooms,
-        safe_rooms,
-    )) is not None:
+        print(f"Visited rooms: {agent.frontier.visited}")
+        return _restart_to_exit(agent)
+    if (room := _select_room(agent)) is not None:
         percepts = agent.take_action(Action.MOVE, room)
-        if percepts["glitter"]:
+        if percepts.glitter:
             print(f"FIND GOLD at room: {room}")
-        if not percepts["bump"]:
-            c_visited_rooms.add(room)
+        if not percepts.bump:
             print(f"Move to room: {room}")
         else:
             agent.backtrack()  # Remove the wall from the stack
             print(f"Bumped into the wall at {room}")
     else:
-        result = _agent_make_desicion(
-            agent,
-            c_visited_rooms=c_visited_rooms,
-            take_risk=take_risk,
-        )
-        percepts, new_visited_rooms = result
-        c_visited_rooms = new_visited_rooms
+        percepts = _agent_make_desicion(agent, take_risk=take_risk)
 
-    return (percepts, c_visited_rooms)
+    return percepts
 
 
-def _select_room(
-    agent: Agent,
-    visited_rooms: Set[Tuple[int, int]],
-    safe_rooms: List[Tuple[int, int]],
-) -> Tuple[int, int] | None:
+def _select_room(agent: Agent) -> Tuple[int, int] | None:
     """Select a room that is not visited yet, and is safe to move to
     If there is no room that is not visited yet, then return None
 
     Args:
         agent (Agent): Agent
-        visited_rooms (Set[Tuple[int, int]]): Visited rooms
-        safe_rooms (List[Tuple[int, int]]): Safe rooms
-        deprioritized_direction (Set[Direction]): Deprioritized direction, avoid selecting a room
-            that is in this direction
 
     Returns:
         Tuple[int, int] | None: None if there is no room that is not visited yet
     """
-    not_visited_rooms = [room for room in safe_rooms if room not in visited_rooms]
+    not_visited_rooms = agent.frontier.adjacent_unvisited(
+        agent.board.virtual_agent_position()
+    )
     if not not_visited_rooms:
         return None
     print(
@@ -103,9 +82,8 @@ def _select_room(
 
 def _agent_make_desicion(
     agent: Agent,
-    c_visited_rooms: Set[Tuple[int, int]],
     take_risk: bool,
-) -> Tuple[Percepts, Set[Tuple[int, int]]]:
+) -> Percepts:
     """Agent makes a decision sequentially:
     1. Looking for the wumpus and shoot the arrow
     2. Decide to backtrack to the previous room or go to step 3
@@ -113,7 +91,7 @@ def _agent_make_desicion(
 
     Args:
         agent (Agent): Agent
-        visited_rooms (Optional[Set[Tuple[int, int]]], optional): Visited rooms.
+        take_risk (bool): Whether the agent has been stuck for too long
 
     Returns:
         Percepts: Percepts of the function call agent.take_action
@@ -124,22 +102,21 @@ def _agent_make_desicion(
             agent,
         )
     ) is not None:
-        return (percepts, c_visited_rooms)
-    if not take_risk and (percepts := _move_back_to_previous_room(agent, c_visited_rooms)) is not None:
+        return percepts
+    if not take_risk and (percepts := _move_to_frontier(agent)) is not None:
+        return percepts
+    if not take_risk and (percepts := _move_back_to_previous_room(agent)) is not None:
         return percepts
     if (
         agent.state == AgentState.TRY_TO_EXIT
-        and (percepts := _go_to_undecidable_pit(agent, c_visited_rooms)) is not None
+        and (percepts := _go_to_undecidable_pit(agent)) is not None
         and len(agent.safe_rooms()) == 0
     ):
         return percepts
-    return _restart_to_exit(agent, c_visited_rooms)
+    return _restart_to_exit(agent)
 
 
-def _go_to_undecidable_pit(
-    agent: Agent,
-    c_visited_rooms: Set[Tuple[int, int]],
-) -> Percepts | None:
+def _go_to_undecidable_pit(agent: Agent) -> Percepts | None:
     """Go to a room that may contain pit
 
     Args:
@@ -148,18 +125,21 @@ def _go_to_undecidable_pit(
     Returns:
         Percepts | None: Percepts of the function call agent.take_action if there is a room
     """
-    rooms: List[Tuple[int, int]] = agent.pit_rooms(target=CellValue.MAYBE)
+    kb = agent.board.kb
+    rooms: List[Tuple[int, int]] = [
+        room
+        for room in agent.frontier.adjacent_risky(agent.board.virtual_agent_position())
+        if kb.ask(room[0], room[1], Predicate.PIT) == CellValue.MAYBE
+    ]
     if len(rooms) == 0:
         return None
     choice = agent.random_select_room(rooms)
     print(f"Move to room that may contain pit: {choice}")
     percepts = agent.take_action(Action.MOVE, choice)
     print(f"Percepts: {percepts}")
-    if not percepts["bump"]:
-        c_visited_rooms.add(choice)
-    else:
+    if percepts.bump:
         print(f"Bump into the wall at room {choice}")
-    return (percepts, c_visited_rooms)
+    return percepts
 
 
 def _find_wumpus_and_shoot_arrow(
@@ -184,21 +164,56 @@ def _find_wumpus_and_shoot_arrow(
         return None
     choice = agent.random_select_room(rooms)
     percepts = agent.take_action(Action.SHOOT, choice)
-    if not percepts["scream"]:
+    if not percepts.scream:
         print(f"Shoot arrow to room: {choice} and hear nothing")
     else:
         print(f"Shoot arrow to room: {choice} and hear the scream")
     return percepts
 
 
-def _move_back_to_previous_room(
-    agent: Agent, c_visited_rooms: Set[Tuple[int, int]]
-) -> Tuple[Percepts, Set[Tuple[int, int]]] | None:
+def _walk_to_exit(agent: Agent) -> Percepts | None:
+    """Move one room along a shortest safe path to the exit
+
+    Args:
+        agent (Agent): Agent
+
+    Returns:
+        Percepts | None: None if the agent is at the exit or no safe path to it is known
+    """
+    here = agent.board.virtual_agent_position()
+    room = agent.navigation.next_to_exit(here)
+    if room is None or room == here:
+        return None
+    print(f"Walk to the exit through room: {room}")
+    return agent.take_action(Action.MOVE, room)
+
+
+def _move_to_frontier(agent: Agent) -> Percepts | None:
+    """Move one room along a shortest safe path to the nearest safe room not visited yet
+
+    Args:
+        agent (Agent): Agent
+
+    Returns:
+        Percepts | None: None if no such room can be reached
+    """
+    if agent.frontier.is_empty():
+        return None
+    here = agent.board.virtual_agent_position()
+    room = agent.frontier.next_step(here)
+    if room is None or room == here:
+        return None
+    print(
+        f"Move towards unvisited room {agent.frontier.nearest(here)} through room: {room}"
+    )
+    return agent.take_action(Action.MOVE, room)
+
+
+def _move_back_to_previous_room(agent: Agent) -> Percepts | None:
     """Move back to the previous room
 
     Args:
         agent (Agent): Agent
-        c_visited_rooms (Set[Tuple[int, int]]): Visited rooms
 
     Returns:
         Percepts | None: Percepts of the function call agent.take_action if there is a room
@@ -206,18 +221,15 @@ def _move_back_to_previous_room(
     last_room = agent.backtrack()
     if last_room is None:
         return None
-    c_visited_rooms.add(agent.latest_room())
     print(f"Move back to room: {last_room}")
-    percepts = agent.take_action(Action.MOVE, last_room)
-    return (percepts, c_visited_rooms)
+    return agent.take_action(Action.MOVE, last_room)
 
 
-def _restart_to_exit(
-    agent: Agent, visited_rooms: Set[Tuple[int, int]]
-) -> Tuple[Percepts, Set[Tuple[int, int]]]:
+def _restart_to_exit(agent: Agent) -> Percepts:
     print(f"Start to exit at the current room: {agent.latest_room()}")
     current_room = agent.latest_room()
     agent.stack.clear()
     agent.stack.append(current_room)
     agent.state = AgentState.TRY_TO_EXIT
-    return (agent.board.current_percepts, {current_room})
+    agent.frontier.restart(agent.board.virtual_agent_position())
+    return agent.board.current_percepts
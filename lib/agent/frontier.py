@@ -0,0 +1,123 @@
+from typing import Iterable, List, Set, Tuple
+
+from lib.agent.navigation import Navigation
+from lib.knowledge_base.cell import CellValue, Predicate
+
+Room = Tuple[int, int]
+
+
+class Frontier:
+    """
+    Rooms left to explore, kept up to date from the cells changed by each tell.
+
+    unvisited holds the safe rooms the agent has not been in since the last restart,
+    risky the rooms that may hold a wumpus or a pit. The unvisited rooms are the
+    targets of the navigation, whose distance field gives the nearest one by safe
+    path and the way to it.
+    """
+
+    def __init__(self, navigation: Navigation, start: Room) -> None:
+        self.navigation = navigation
+        self.kb = navigation.kb
+        self.visited: Set[Room] = {start}
+        self.unvisited: Set[Room] = set()
+        self.risky: Set[Room] = set()
+        self._bounds: Tuple[int | None, ...] | None = None
+
+    def rebuild(self) -> None:
+        """
+        Start over from the knowledge base, after a new wall or after it went back
+        """
+        kb = self.kb
+        self._bounds = (kb.top, kb.right, kb.bottom, kb.left)
+        unvisited = set(kb.safe_cells) - self.visited
+        self.navigation.remove_targets(self.unvisited - unvisited)
+        self.navigation.add_targets(unvisited - self.unvisited)
+        self.unvisited = unvisited
+        self.risky = {
+            room
+            for room, value in kb.wumpus_cells + kb.pit_cells
+            if value == CellValue.MAYBE
+        }
+
+    def update(self, rooms: Iterable[Room]) -> None:
+        """
+        Take in the rooms changed by the last tell
+        """
+        kb = self.kb
+        if (kb.top, kb.right, kb.bottom, kb.left) != self._bounds:
+            self.rebuild()
+            return
+        added = []
+        for room in rooms:
+            x, y = room
+            if kb.check_oob(x, y):
+                continue
+            if kb.ask(x, y, "is_safe"):
+                self.risky.discard(room)
+                if room not in self.visited and room not in self.unvisited:
+                    self.unvisited.add(room)
+                    added.append(room)
+            elif (
+                kb.ask(x, y, Predicate.WUMPUS) == CellValue.MAYBE
+                or kb.ask(x, y, Predicate.PIT) == CellValue.MAYBE
+            ):
+                self.risky.add(room)
+            else:
+                self.risky.discard(room)
+        self.navigation.add_targets(added)
+
+    def visit(self, room: Room) -> None:
+        self.visited.add(room)
+        if room in self.unvisited:
+            self.unvisited.discard(room)
+            self.navigation.remove_targets([room])
+
+    def restart(self, room: Room) -> None:
+        """
+        Forget the visited rooms, the agent starts over from room
+        """
+        kb = self.kb
+        # A room bumped into can end up visited, it is beyond the wall
+        again = [
+            other
+            for other in self.visited
+            if other != room and not kb.check_oob(other[0], other[1])
+        ]
+        self.unvisited.update(again)
+        self.navigation.add_targets(again)
+        self.visited = {room}
+        if room in self.unvisited:
+            self.unvisited.discard(room)
+            self.navigation.remove_targets([room])
+
+    def is_empty(self) -> bool:
+        return not self.unvisited
+
+    def adjacent_unvisited(self, room: Room) -> List[Room]:
+        return self._adjacent(room, self.unvisited)
+
+    def adjacent_risky(self, room: Room) -> List[Room]:
+        return self._adjacent(room, self.risky)
+
+    @staticmethod
+    def _adjacent(room: Room, rooms: Set[Room]) -> List[Room]:
+        x, y = room
+        return [
+            other
+            for other in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1))
+            if other in rooms
+        ]
+
+    def nearest(self, room: Room) -> Room | None:
+        """
+        Unvisited room at the end of a shortest safe path from room, None if no
+        unvisited room can be reached
+        """
+        return self.navigation.to_target.origin.get(room)
+
+    def next_step(self, room: Room) -> Room | None:
+        """
+        Next room on a shortest safe path to the nearest unvisited room
+        """
+        return self.navigation.next_to_target(room)
@@ -0,0 +1,201 @@
+from collections import deque
+from typing import Deque, Dict, Iterable, Set, Tuple
+
+from lib.knowledge_base.knowledge_base import KnowledgeBase
+
+Room = Tuple[int, int]
+
+
+def _neighbours(room: Room) -> Tuple[Room, Room, Room, Room]:
+    x, y = room
+    return ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1))
+
+
+class DistanceField:
+    """
+    BFS distances from the passable rooms to the nearest of the sources.
+
+    A new passable room or a new source can only shorten paths, so distances are
+    relaxed from it. A source that goes away lengthens only the paths that ended at
+    it: those rooms are cleared and relaxed again from their neighbours.
+    """
+
+    def __init__(self, passable: Set[Room]) -> None:
+        self.passable = passable
+        self.sources: Set[Room] = set()
+        self.distance: Dict[Room, int] = {}
+        # Source each distance leads to
+        self.origin: Dict[Room, Room] = {}
+
+    def rebuild(self) -> None:
+        self.distance = {}
+        self.origin = {}
+        self.add_sources(list(self.sources))
+
+    def add_rooms(self, rooms: Iterable[Room]) -> None:
+        """
+        Take in rooms that became passable
+        """
+        distance, origin = self.distance, self.origin
+        queue: Deque[Room] = deque()
+        for room in rooms:
+            if room in self.sources:
+                distance[room] = 0
+                origin[room] = room
+                queue.append(room)
+                continue
+            best = distance.get(room)
+            for neighbour in _neighbours(room):
+                if neighbour in distance and (
+                    best is None or distance[neighbour] + 1 < best
+                ):
+                    best = distance[neighbour] + 1
+                    origin[room] = origin[neighbour]
+            if best is not None:
+                distance[room] = best
+                queue.append(room)
+        self._relax(queue)
+
+    def add_sources(self, rooms: Iterable[Room]) -> None:
+        queue: Deque[Room] = deque()
+        for room in rooms:
+            self.sources.add(room)
+            if room in self.passable and self.distance.get(room) != 0:
+                self.distance[room] = 0
+                self.origin[room] = room
+                queue.append(room)
+        self._relax(queue)
+
+    def remove_sources(self, rooms: Iterable[Room]) -> None:
+        distance, origin = self.distance, self.origin
+        cleared: Set[Room] = set()
+        for source in rooms:
+            self.sources.discard(source)
+            if origin.get(source) != source:
+                continue
+            # Rooms leading to a source are connected to it through each other
+            region = [source]
+            cleared.add(source)
+            for room in region:
+                for neighbour in _neighbours(room):
+                    if neighbour not in cleared and origin.get(neighbour) == source:
+                        cleared.add(neighbour)
+                        region.append(neighbour)
+            for room in region:
+                del distance[room]
+                del origin[room]
+        queue: Deque[Room] = deque()
+        for room in cleared:
+            best = None
+            for neighbour in _neighbours(room):
+                if neighbour in distance and (
+                    best is None or distance[neighbour] < distance[best]
+                ):
+                    best = neighbour
+            if best is not None:
+                distance[room] = distance[best] + 1
+                origin[room] = origin[best]
+                queue.append(room)
+        self._relax(queue)
+
+    def _relax(self, queue: Deque[Room]) -> None:
+        distance, origin, passable = self.distance, self.origin, self.passable
+        while queue:
+            room = queue.popleft()
+            steps = distance[room] + 1
+            for neighbour in _neighbours(room):
+                if neighbour in passable and distance.get(neighbour, steps + 1) > steps:
+                    distance[neighbour] = steps
+                    origin[neighbour] = origin[room]
+                    queue.append(neighbour)
+
+    def next_step(self, room: Room) -> Room | None:
+        """
+        Next room on a shortest path to the nearest source, room itself at a source,
+        None if no source can be reached
+        """
+        steps = self.distance.get(room)
+        if steps is None:
+            return None
+        if steps == 0:
+            return room
+        for neighbour in _neighbours(room):
+            if self.distance.get(neighbour) == steps - 1:
+                return neighbour
+        return None
+
+
+class Navigation:
+    """
+    Shortest paths over the rooms the knowledge base knows to be safe.
+
+    Two distance fields are kept as rooms become safe, one to the exit and one to
+    the nearest target room. A new wall takes rooms away, both are rebuilt then.
+    """
+
+    def __init__(self, kb: KnowledgeBase) -> None:
+        self.kb = kb
+        self.safe: Set[Room] = set()
+        # Empty while the exit is unknown
+        self.to_exit = DistanceField(self.safe)
+        self.to_target = DistanceField(self.safe)
+        self._bounds: Tuple[int | None, ...] | None = None
+
+    @property
+    def distance(self) -> Dict[Room, int]:
+        """
+        Steps from each safe room to the exit
+        """
+        return self.to_exit.distance
+
+    def rebuild(self) -> None:
+        """
+        Start over from the knowledge base, after a new wall or after it went back
+        """
+        kb = self.kb
+        self._bounds = (kb.top, kb.right, kb.bottom, kb.left)
+        self.safe.clear()
+        self.safe.update(kb.safe_cells)
+        exit_room = kb.exit
+        self.to_exit.sources = {exit_room} if exit_room is not None else set()
+        self.to_exit.rebuild()
+        self.to_target.rebuild()
+
+    def update(self, rooms: Iterable[Room]) -> None:
+        """
+        Take in the rooms changed by the last tell
+        """
+        kb = self.kb
+        if (kb.top, kb.right, kb.bottom, kb.left) != self._bounds:
+            self.rebuild()
+            return
+        new = [
+            room
+            for room in rooms
+            if room not in self.safe
+            and not kb.check_oob(room[0], room[1])
+            and kb.ask(room[0], room[1], "is_safe")
+        ]
+        self.safe.update(new)
+        self.to_exit.add_rooms(new)
+        self.to_target.add_rooms(new)
+
+    def add_targets(self, rooms: Iterable[Room]) -> None:
+        self.to_target.add_sources(rooms)
+
+    def remove_targets(self, rooms: Iterable[Room]) -> None:
+        self.to_target.remove_sources(rooms)
+
+    def next_to_exit(self, room: Room) -> Room | None:
+        """
+        Next room on a shortest safe path to the exit, room itself at the exit,
+        None if no such path is known
+        """
+        return self.to_exit.next_step(room)
+
+    def next_to_target(self, room: Room) -> Room | None:
+        """
+        Next room on a shortest safe path to the nearest target, room itself on a
+        target, None if no target can be reached
+        """
+        return self.to_target.next_step(room)
@@ -1,38 +1,20 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from typing import NamedTuple
 
 
-@dataclass
-class CartesianCoord:
+# Coordinates are immutable tuples: hashable, slot-free, and equal to the plain
+# (x, y) tuples used as keys by the knowledge base.
+class CartesianCoord(NamedTuple):
     x: int
     y: int
 
     def to_downward(self, height: int) -> DownwardCoord:
         return DownwardCoord(self.x, height - self.y - 1)
 
-    def __iter__(self):
-        return iter((self.x, self.y))
 
-    def __getitem__(self, index):
-        if index == 0:
-            return self.x
-        elif index == 1:
-            return self.y
-
-
-@dataclass
-class DownwardCoord:
+class DownwardCoord(NamedTuple):
     x: int
     y: int
 
     def to_cartesian(self, height: int) -> CartesianCoord:
         return CartesianCoord(self.x, height - self.y - 1)
-
-    def __iter__(self):
-        return iter((self.x, self.y))
-
-    def __getitem__(self, index):
-        if index == 0:
-            return self.x
-        elif index == 1:
-            return self.y
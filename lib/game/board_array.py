@@ -0,0 +1,79 @@
+"""
+NumPy views of TileGrid boards, for whole-map and batched map processing.
+
+Arrays hold the TileGrid flag bytes with the rows and columns on the last two axes,
+so every function here works on one (height, width) map or a (n, height, width) stack.
+"""
+
+import numpy as np
+
+from lib.game.board_data import TILE_BITS, TileGrid, TileType
+
+WUMPUS = TILE_BITS[TileType.WUMPUS]
+PIT = TILE_BITS[TileType.PIT]
+GOLD = TILE_BITS[TileType.GOLD]
+BREEZE = TILE_BITS[TileType.BREEZE]
+STENCH = TILE_BITS[TileType.STENCH]
+
+
+def to_array(grid: TileGrid) -> np.ndarray:
+    """
+    (height, width) uint8 view sharing the memory of the grid
+    """
+    return np.frombuffer(grid.data, dtype=np.uint8).reshape(grid.height, grid.width)
+
+
+def from_array(tiles: np.ndarray) -> TileGrid:
+    height, width = tiles.shape
+    return TileGrid(width, height, bytearray(np.ascontiguousarray(tiles, np.uint8)))
+
+
+def stack(grids: list[TileGrid]) -> np.ndarray:
+    """
+    (n, height, width) copy of grids that all have the same size
+    """
+    return np.stack([to_array(grid) for grid in grids])
+
+
+def around(layer: np.ndarray) -> np.ndarray:
+    """
+    Tiles next to any tile set in a boolean layer
+    """
+    res = np.zeros_like(layer)
+    res[..., 1:, :] |= layer[..., :-1, :]
+    res[..., :-1, :] |= layer[..., 1:, :]
+    res[..., :, 1:] |= layer[..., :, :-1]
+    res[..., :, :-1] |= layer[..., :, 1:]
+    return res
+
+
+def enviroment(tiles: np.ndarray) -> np.ndarray:
+    """
+    STENCH/BREEZE flags implied by the wumpuses and pits of the tiles
+    """
+    stench = around((tiles & WUMPUS) != 0)
+    breeze = around((tiles & PIT) != 0)
+    return (stench * STENCH | breeze * BREEZE).astype(np.uint8)
+
+
+def put_enviroment_array(tiles: np.ndarray) -> np.ndarray:
+    """
+    Same as board_data.put_enviroment, in place on one map or a stack of maps
+    """
+    tiles |= enviroment(tiles)
+    return tiles
+
+
+def count_tiles(tiles: np.ndarray, tile_type: TileType) -> np.ndarray:
+    """
+    Number of tiles of a type in every map
+    """
+    return np.count_nonzero(tiles & TILE_BITS[tile_type], axis=(-2, -1))
+
+
+def check_enviroment(tiles: np.ndarray) -> np.ndarray:
+    """
+    Whether the STENCH/BREEZE flags of every map match its wumpuses and pits
+    """
+    sensed = tiles & (STENCH | BREEZE)
+    return np.all(sensed == enviroment(tiles), axis=(-2, -1))
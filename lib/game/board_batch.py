@@ -0,0 +1,242 @@
+"""
+Many games stepped at once, with the rules and scoring of BoardModel.act.
+
+Boards of different sizes are padded into one (n, height, width) array, each one
+in the top-left corner, so a Cartesian (x, y) of game g is row heights[g] - 1 - y.
+"""
+
+from typing import NamedTuple, Sequence
+
+import numpy as np
+
+from lib.game import board_array
+from lib.game.board_data import BoardData
+from lib.game.board_model import (
+    ARROW_POINTS,
+    CLIMB_OUT_POINTS,
+    DIRECTION_DELTA,
+    GOLD_POINTS,
+    MOVE_POINTS,
+    PIT_POINTS,
+    WUMPUS_POINTS,
+    Action,
+    BoardModel,
+    Direction,
+    GameState,
+)
+from lib.percepts import Percepts
+
+MOVE = Action.MOVE.value
+SHOOT = Action.SHOOT.value
+CLIMB = Action.CLIMB.value
+PLAYING = GameState.PLAYING.value
+
+# Percept bits sensed on a tile, for every flag byte
+_TILE_PERCEPTS = np.array(
+    [BoardModel._tile_percepts(flags) for flags in range(256)], dtype=np.uint8
+)
+# Cartesian step of each Direction value
+_DX = np.zeros(len(Direction) + 1, dtype=np.int64)
+_DY = np.zeros(len(Direction) + 1, dtype=np.int64)
+for direction, (dx, dy) in DIRECTION_DELTA.items():
+    _DX[direction.value], _DY[direction.value] = dx, dy
+_NEIGHBOURS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+
+class StepResult(NamedTuple):
+    # (n, 5) percepts in Percepts.NAMES order, the last ones of a game that ended
+    percepts: np.ndarray
+    # Points scored by the step
+    rewards: np.ndarray
+    # Games that ended, they have already been reset
+    done: np.ndarray
+    # GameState values at the end of the step, before the reset
+    states: np.ndarray
+
+
+class BatchBoardModel:
+    """
+    n BoardModel games held in arrays, stepped with one vector of actions.
+
+    Finished games are replaced by the next map of the boards, round-robin. Each step
+    scores exactly like BoardModel.act; climbing anywhere but (0, 0), which makes
+    act raise, ends the game as LOST_UNKNOWN like the engine does.
+
+    Args:
+        boards (Sequence[BoardData]): Maps to play, a MapCorpus works
+        n (int): Number of games played at once
+    """
+
+    def __init__(self, boards: Sequence[BoardData], n: int) -> None:
+        boards = [boards[i] for i in range(len(boards))]
+        self.map_heights = np.array([board.height for board in boards])
+        self.map_widths = np.array([board.width for board in boards])
+        height, width = self.map_heights.max(), self.map_widths.max()
+        self._maps = np.zeros((len(boards), height, width), dtype=np.uint8)
+        for i, board in enumerate(boards):
+            grid = board.board_data
+            self._maps[i, : grid.height, : grid.width] = board_array.to_array(grid)
+        self._map_wumpus_around = _count_around(self._maps & board_array.WUMPUS)
+        self._map_agents = np.array(
+            [
+                board.initial_agent_pos.to_cartesian(board.height)
+                for board in boards
+            ]
+        ).reshape(len(boards), 2)
+
+        self.n = n
+        self.tiles = np.zeros((n, height, width), dtype=np.uint8)
+        self.wumpus_around = np.zeros((n, height, width), dtype=np.int8)
+        self.maps = np.zeros(n, dtype=np.int64)
+        self.heights = np.zeros(n, dtype=np.int64)
+        self.widths = np.zeros(n, dtype=np.int64)
+        self.x = np.zeros(n, dtype=np.int64)
+        self.y = np.zeros(n, dtype=np.int64)
+        self.directions = np.zeros(n, dtype=np.int64)
+        self.points = np.zeros(n, dtype=np.int64)
+        self.states = np.zeros(n, dtype=np.int64)
+        # Percept bits of each game, what BoardModel.current_percepts holds
+        self.current = np.zeros(n, dtype=np.uint8)
+        self._next_map = 0
+        self.reset(np.arange(n))
+
+    def reset(self, games: np.ndarray) -> None:
+        """
+        Start the next maps on the given games
+        """
+        maps = (self._next_map + np.arange(len(games))) % len(self._maps)
+        self._next_map = (self._next_map + len(games)) % len(self._maps)
+        self.maps[games] = maps
+        self.tiles[games] = self._maps[maps]
+        self.wumpus_around[games] = self._map_wumpus_around[maps]
+        self.heights[games] = self.map_heights[maps]
+        self.widths[games] = self.map_widths[maps]
+        self.x[games] = self._map_agents[maps, 0]
+        self.y[games] = self._map_agents[maps, 1]
+        self.directions[games] = Direction.RIGHT.value
+        self.points[games] = 0
+        self.states[games] = PLAYING
+        self.current[games] = self._percepts_here(games)
+
+    def percepts(self) -> np.ndarray:
+        """
+        (n, 5) current percepts of every game, in Percepts.NAMES order
+        """
+        return _unpack(self.current)
+
+    def step(
+        self, actions: np.ndarray, directions: np.ndarray | None = None
+    ) -> StepResult:
+        """
+        Act on every game at once.
+
+        Args:
+            actions (np.ndarray): Action value of every game
+            directions (np.ndarray | None, optional): Direction value every game turns
+                to before acting, 0 to keep its direction
+
+        Returns:
+            StepResult: Percepts, points scored, games that ended and their state
+        """
+        actions = np.asarray(actions)
+        if directions is not None:
+            directions = np.asarray(directions)
+            turn = directions != 0
+            self.directions[turn] = directions[turn]
+        rewards = np.zeros(self.n, dtype=np.int64)
+        states = self.states
+        tx = self.x + _DX[self.directions]
+        ty = self.y + _DY[self.directions]
+        inside = (tx >= 0) & (tx < self.widths) & (ty >= 0) & (ty < self.heights)
+        at_exit = (self.x == 0) & (self.y == 0)
+        move = actions == MOVE
+        shoot = actions == SHOOT
+        climb = actions == CLIMB
+
+        won = at_exit & (climb | move & (self.directions == Direction.DOWN.value))
+        rewards[won] += CLIMB_OUT_POINTS
+        states[won] = GameState.WON.value
+        states[climb & ~at_exit] = GameState.LOST_UNKNOWN.value
+
+        self.current[move & ~won & ~inside] |= 1 << Percepts.BUMP
+        walk = np.flatnonzero(move & ~won & inside)
+        if len(walk):
+            self._walk(walk, tx[walk], ty[walk], rewards)
+
+        shooters = np.flatnonzero(shoot)
+        if len(shooters):
+            self._shoot(shooters, tx[shooters], ty[shooters], inside[shooters], rewards)
+
+        self.points += rewards
+        done = states != PLAYING
+        result = StepResult(_unpack(self.current), rewards, done, states.copy())
+        if done.any():
+            self.reset(np.flatnonzero(done))
+        return result
+
+    def _percepts_here(self, games: np.ndarray) -> np.ndarray:
+        rows = self.heights[games] - 1 - self.y[games]
+        return _TILE_PERCEPTS[self.tiles[games, rows, self.x[games]]]
+
+    def _walk(
+        self, games: np.ndarray, x: np.ndarray, y: np.ndarray, rewards: np.ndarray
+    ) -> None:
+        self.x[games], self.y[games] = x, y
+        rewards[games] += MOVE_POINTS
+        rows = self.heights[games] - 1 - y
+        flags = self.tiles[games, rows, x]
+        self.current[games] = _TILE_PERCEPTS[flags]
+
+        gold = flags & board_array.GOLD != 0
+        rewards[games[gold]] += GOLD_POINTS
+        self.tiles[games[gold], rows[gold], x[gold]] &= ~np.uint8(board_array.GOLD)
+        pit = flags & board_array.PIT != 0
+        rewards[games[pit]] += PIT_POINTS
+        self.states[games[pit]] = GameState.LOST_PIT.value
+        # Checked after the pit, like act does
+        wumpus = flags & board_array.WUMPUS != 0
+        rewards[games[wumpus]] += WUMPUS_POINTS
+        self.states[games[wumpus]] = GameState.LOST_WUMPUS.value
+
+    def _shoot(
+        self,
+        games: np.ndarray,
+        x: np.ndarray,
+        y: np.ndarray,
+        inside: np.ndarray,
+        rewards: np.ndarray,
+    ) -> None:
+        rewards[games] += ARROW_POINTS
+        rows = np.where(inside, self.heights[games] - 1 - y, 0)
+        x = np.where(inside, x, 0)
+        hit = inside & (self.tiles[games, rows, x] & board_array.WUMPUS != 0)
+        hit_games, rows, x = games[hit], rows[hit], x[hit]
+        self.tiles[hit_games, rows, x] &= ~np.uint8(board_array.WUMPUS)
+        _, height, width = self.tiles.shape
+        for dr, dc in _NEIGHBOURS:
+            r, c = rows + dr, x + dc
+            keep = (r >= 0) & (r < height) & (c >= 0) & (c < width)
+            g, r, c = hit_games[keep], r[keep], c[keep]
+            self.wumpus_around[g, r, c] -= 1
+            clear = self.wumpus_around[g, r, c] == 0
+            self.tiles[g[clear], r[clear], c[clear]] &= ~np.uint8(board_array.STENCH)
+
+        self.current[games] = self._percepts_here(games)
+        self.current[hit_games] |= 1 << Percepts.SCREAM
+
+
+def _count_around(layer: np.ndarray) -> np.ndarray:
+    """
+    Number of set tiles next to every tile
+    """
+    layer = (layer != 0).astype(np.int8)
+    counts = np.zeros_like(layer)
+    counts[..., 1:, :] += layer[..., :-1, :]
+    counts[..., :-1, :] += layer[..., 1:, :]
+    counts[..., :, 1:] += layer[..., :, :-1]
+    counts[..., :, :-1] += layer[..., :, 1:]
+    return counts
+
+
+def _unpack(bits: np.ndarray) -> np.ndarray:
+    return (bits[:, None] >> np.arange(len(Percepts.NAMES), dtype=np.uint8)) & 1 != 0
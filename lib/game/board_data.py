@@ -1,5 +1,8 @@
+from collections.abc import MutableSet, Sequence
 from dataclasses import dataclass
 from enum import Enum
+import os
+from typing import Iterable, Iterator, TextIO
 
 from rich.table import Table
 from rich import print
@@ -31,50 +34,262 @@ class TileType(Enum):
                 return "S"
 
 
+# One bit per tile type in a TileGrid byte
+TILE_BITS = {tile: 1 << (tile.value - 1) for tile in TileType}
+
+
+class TileSet(MutableSet):
+    """
+    Set view over the flag byte of one tile of a TileGrid
+    """
+
+    __slots__ = ("_data", "_index")
+
+    def __init__(self, data: bytearray, index: int) -> None:
+        self._data = data
+        self._index = index
+
+    def __contains__(self, tile: object) -> bool:
+        bit = TILE_BITS.get(tile)
+        return bit is not None and self._data[self._index] & bit != 0
+
+    def __iter__(self) -> Iterator[TileType]:
+        flags = self._data[self._index]
+        return iter([tile for tile, bit in TILE_BITS.items() if flags & bit])
+
+    def __len__(self) -> int:
+        return bin(self._data[self._index]).count("1")
+
+    def add(self, tile: TileType) -> None:
+        self._data[self._index] |= TILE_BITS[tile]
+
+    def discard(self, tile: TileType) -> None:
+        bit = TILE_BITS.get(tile)
+        if bit is not None:
+            self._data[self._index] &= ~bit
+
+    def __repr__(self) -> str:
+        return repr(set(self))
+
+
+class TileRow(Sequence):
+    __slots__ = ("_data", "_start", "_width")
+
+    def __init__(self, data: bytearray, start: int, width: int) -> None:
+        self._data = data
+        self._start = start
+        self._width = width
+
+    def __getitem__(self, x: int) -> TileSet:
+        if x < 0:
+            x += self._width
+        if not 0 <= x < self._width:
+            raise IndexError("tile index out of range")
+        return TileSet(self._data, self._start + x)
+
+    def __len__(self) -> int:
+        return self._width
+
+
+class TileGrid(Sequence):
+    """
+    Board tiles packed as one flag byte per tile, row-first top-down.
+
+    grid[y][x] gives a set-like view of the tile, so code written against
+    list[list[set[TileType]]] keeps working, while copies are one buffer copy.
+    """
+
+    def __init__(self, width: int, height: int, data: bytearray | None = None) -> None:
+        self.width = width
+        self.height = height
+        self.data = data if data is not None else bytearray(width * height)
+
+    @staticmethod
+    def from_sets(board: list[list[set[TileType]]]) -> "TileGrid":
+        grid = TileGrid(len(board[0]), len(board))
+        for y, row in enumerate(board):
+            for x, tiles in enumerate(row):
+                for tile in tiles:
+                    grid.data[y * grid.width + x] |= TILE_BITS[tile]
+        return grid
+
+    def to_sets(self) -> list[list[set[TileType]]]:
+        return [[set(tiles) for tiles in row] for row in self]
+
+    def flags(self, x: int, y: int) -> int:
+        return self.data[y * self.width + x]
+
+    def __getitem__(self, y: int) -> TileRow:
+        if y < 0:
+            y += self.height
+        if not 0 <= y < self.height:
+            raise IndexError("row index out of range")
+        return TileRow(self.data, y * self.width, self.width)
+
+    def __len__(self) -> int:
+        return self.height
+
+    def copy(self) -> "TileGrid":
+        return TileGrid(self.width, self.height, bytearray(self.data))
+
+    def __deepcopy__(self, memo) -> "TileGrid":
+        return self.copy()
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, TileGrid):
+            return NotImplemented
+        return (self.width, self.height, self.data) == (
+            other.width,
+            other.height,
+            other.data,
+        )
+
+    def __repr__(self) -> str:
+        return f"TileGrid({self.to_sets()})"
+
+
 @dataclass
 class BoardData:
     height: int
     width: int
-    board_data: list[list[set[TileType]]]
+    board_data: TileGrid | list[list[set[TileType]]]
     initial_agent_pos: DownwardCoord
 
 
+def _parse_board_data(height: int, lines: list[str]) -> BoardData:
+    width = len(lines[0].split("."))
+    board_data = TileGrid(width, height)
+    agent_pos = None
+    no_wumpus = True
+
+    for y, line in enumerate(lines):
+        for x, tiles in enumerate(line.split(".")):
+            tiles = tiles.upper()
+            for tile in tiles:
+                if tile == "W":
+                    board_data[y][x].add(TileType.WUMPUS)
+                    no_wumpus = False
+                elif tile == "P":
+                    board_data[y][x].add(TileType.PIT)
+                elif tile == "G":
+                    board_data[y][x].add(TileType.GOLD)
+                elif tile == "A":
+                    agent_pos = x, y
+
+    _check_map(agent_pos is not None, not no_wumpus)
+
+    put_enviroment(board_data)
+    return BoardData(height, width, board_data, DownwardCoord(agent_pos[0], agent_pos[1]))
+
+
+def _check_map(has_agent: bool, has_wumpus: bool) -> None:
+    """
+    Rules a map must follow to be read back
+    """
+    if not has_agent:
+        raise ValueError("No agent position found in map file")
+    if not has_wumpus:
+        raise ValueError("No wumpus found in map file")
+
+
+def _read_maps(f: TextIO) -> Iterator[BoardData]:
+    """
+    Maps of an open file, one at a time: a height line then that many rows, with
+    blank lines allowed between maps
+    """
+    for line in f:
+        if not line.strip():
+            continue
+        height = int(line)
+        rows = []
+        for row in f:
+            rows.append(row.rstrip("\r\n"))
+            if len(rows) == height:
+                break
+        if len(rows) < height:
+            raise ValueError(f"Map of height {height} has only {len(rows)} rows")
+        yield _parse_board_data(height, rows)
+
+
 def read_board_data(filename):
     with open(filename, "r") as f:
-        lines = f.readlines()
-        height = int(lines[0])
-        lines = lines[1:]
-        width = len(lines[0].split("."))
-        board_data = [[set() for _ in range(width)] for _ in range(height)]
-        agent_pos = None
-        no_wumpus = True
-
-        for y, line in enumerate(lines):
-            for x, tiles in enumerate(line.split(".")):
-                tiles = tiles.upper()
-                for tile in tiles:
-                    if tile == "W":
-                        board_data[y][x].add(TileType.WUMPUS)
-                        no_wumpus = False
-                    elif tile == "P":
-                        board_data[y][x].add(TileType.PIT)
-                    elif tile == "G":
-                        board_data[y][x].add(TileType.GOLD)
-                    elif tile == "A":
-                        agent_pos = x, y
-
-        if agent_pos is None:
-            raise ValueError("No agent position found in map file")
-        if no_wumpus:
-            raise ValueError("No wumpus found in map file")
-        if height > 10 or width > 10:
-            raise ValueError("Map too big")
-
-        put_enviroment(board_data)
-        return BoardData(height, width, board_data, DownwardCoord(agent_pos[0], agent_pos[1]))
+        board_data = next(_read_maps(f), None)
+    if board_data is None:
+        raise ValueError(f"No map found in {filename}")
+    return board_data
+
+
+def iter_board_data(path: str) -> Iterator[BoardData]:
+    """
+    Stream the maps of a file, or of every .txt file of a directory by name.
+
+    Only the map being parsed is held in memory.
+    """
+    if os.path.isdir(path):
+        filenames = [
+            os.path.join(path, name)
+            for name in sorted(os.listdir(path))
+            if name.endswith(".txt")
+        ]
+    else:
+        filenames = [path]
+    for filename in filenames:
+        with open(filename, "r") as f:
+            yield from _read_maps(f)
+
+
+def format_board_data(board_data: BoardData) -> str:
+    """
+    Map in the text format read by read_board_data, sensed tiles are left out.
+
+    Raises:
+        ValueError: If read_board_data would reject the map
+    """
+    x, y = board_data.initial_agent_pos
+    lines = [str(board_data.height)]
+    has_agent = has_wumpus = False
+    for row_y, row in enumerate(board_data.board_data):
+        tiles = []
+        for row_x, tile in enumerate(row):
+            code = ""
+            if TileType.WUMPUS in tile:
+                code += "w"
+                has_wumpus = True
+            code += "p" if TileType.PIT in tile else ""
+            code += "g" if TileType.GOLD in tile else ""
+            if (row_x, row_y) == (x, y):
+                code += "a"
+                has_agent = True
+            tiles.append(code or "-")
+        lines.append(".".join(tiles))
+    _check_map(has_agent, has_wumpus)
+    return "\n".join(lines) + "\n"
+
+
+def write_board_data(filename: str, boards: Iterable[BoardData]) -> int:
+    """
+    Write maps one after another to a file that iter_board_data can stream back.
+
+    Returns:
+        int: Number of maps written
+
+    Raises:
+        ValueError: If a map could not be read back, the maps before it are written
+    """
+    count = 0
+    with open(filename, "w") as f:
+        for board_data in boards:
+            if count:
+                f.write("\n")
+            f.write(format_board_data(board_data))
+            count += 1
+    return count
 
 
 def put_enviroment(board_data):
+    if isinstance(board_data, TileGrid):
+        _put_enviroment_flags(board_data)
+        return
     height = len(board_data)
     width = len(board_data[0])
     for y in range(len(board_data)):
@@ -99,6 +314,28 @@ def put_enviroment(board_data):
                     board_data[y][x + 1].add(TileType.BREEZE)
 
 
+def _put_enviroment_flags(grid: TileGrid):
+    width, height, data = grid.width, grid.height, grid.data
+    wumpus, pit = TILE_BITS[TileType.WUMPUS], TILE_BITS[TileType.PIT]
+    for i in range(width * height):
+        sensed = 0
+        if data[i] & wumpus:
+            sensed |= TILE_BITS[TileType.STENCH]
+        if data[i] & pit:
+            sensed |= TILE_BITS[TileType.BREEZE]
+        if not sensed:
+            continue
+        y, x = divmod(i, width)
+        if y > 0:
+            data[i - width] |= sensed
+        if y < height - 1:
+            data[i + width] |= sensed
+        if x > 0:
+            data[i - 1] |= sensed
+        if x < width - 1:
+            data[i + 1] |= sensed
+
+
 def print_map_debug(map: list[list[set[TileType]]], initial_agent_position):
     table = Table(show_header=False, show_lines=True)
     str_map = [[str() for _ in range(len(map[0]))] for _ in range(len(map))]
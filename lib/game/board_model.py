@@ -1,6 +1,6 @@
 import enum
 from lib.coord import CartesianCoord, DownwardCoord
-from lib.game.board_data import BoardData, TileType, put_enviroment
+from lib.game.board_data import TILE_BITS, BoardData, TileGrid, TileType
 from lib.percepts import Percepts
 
 GOLD_POINTS = 1000
@@ -11,6 +11,14 @@ CLIMB_OUT_POINTS = 10
 MOVE_POINTS = -10
 
 
+# Percept bits sensed on a tile
+TILE_PERCEPTS = {
+    TileType.GOLD: 1 << Percepts.GLITTER,
+    TileType.BREEZE: 1 << Percepts.BREEZE,
+    TileType.STENCH: 1 << Percepts.STENCH,
+}
+
+
 class Direction(enum.Enum):
     UP = 1
     DOWN = 2
@@ -18,6 +26,15 @@ class Direction(enum.Enum):
     RIGHT = 4
 
 
+# Cartesian (x, y) step of each direction
+DIRECTION_DELTA: dict[Direction, tuple[int, int]] = {
+    Direction.UP: (0, 1),
+    Direction.DOWN: (0, -1),
+    Direction.LEFT: (-1, 0),
+    Direction.RIGHT: (1, 0),
+}
+
+
 class Action(enum.Enum):
     MOVE = 1
     SHOOT = 2
@@ -34,38 +51,74 @@ class GameState(enum.Enum):
 
 class BoardModel:
     def __init__(self, board_data: BoardData):
+        if not isinstance(board_data.board_data, TileGrid):
+            board_data.board_data = TileGrid.from_sets(board_data.board_data)
         self.board_data = board_data
-        self.board = board_data.board_data
+        self.board: TileGrid = board_data.board_data
         self.width = board_data.width
         self.height = board_data.height
+        # Flag byte of each tile, row-first top-down
+        self._tiles = self.board.data
         # x, y
         self._agent = board_data.initial_agent_pos.to_cartesian(self.height)
         print(self._agent)
         self.agent_direction = Direction.RIGHT
         self.points = 0
         self.game_over = GameState.PLAYING
+        # Percept bits sensed on each tile, row-first top-down
+        self._percepts = bytearray(
+            self._tile_percepts(self._tiles[i]) for i in range(len(self._tiles))
+        )
         self.current_percepts = Percepts()
         self._update_percepts()
         self.initial_agent_pos = self._agent
+        # Number of wumpuses next to each tile, row-first top-down. Pits never
+        # change, so BREEZE needs no count
+        self._wumpus_around = self._count_around(TileType.WUMPUS)
+        # (container, key, old value) of every write since the first snapshot
+        self._trail: list[tuple] | None = None
+
+    @staticmethod
+    def _tile_percepts(flags: int) -> int:
+        bits = 0
+        for tile, percept in TILE_PERCEPTS.items():
+            if flags & TILE_BITS[tile]:
+                bits |= percept
+        return bits
+
+    def _index(self, pos: CartesianCoord) -> int:
+        return (self.height - 1 - pos.y) * self.width + pos.x
+
+    def _neighbours(self, x: int, y: int) -> list[tuple[int, int]]:
+        """
+        Tiles next to (x, y), row-first top-down
+        """
+        neighbours = []
+        if y > 0:
+            neighbours.append((x, y - 1))
+        if y < self.height - 1:
+            neighbours.append((x, y + 1))
+        if x > 0:
+            neighbours.append((x - 1, y))
+        if x < self.width - 1:
+            neighbours.append((x + 1, y))
+        return neighbours
 
-    def _current_agent_tile_on_board(self) -> set[TileType]:
-        x, y = self._agent.to_downward(self.height)
-        return self.board_data.board_data[y][x]
+    def _count_around(self, tile_type: TileType) -> list[list[int]]:
+        counts = [[0 for _ in range(self.width)] for _ in range(self.height)]
+        bit = TILE_BITS[tile_type]
+        for y in range(self.height):
+            for x in range(self.width):
+                if self._tiles[y * self.width + x] & bit:
+                    for nx, ny in self._neighbours(x, y):
+                        counts[ny][nx] += 1
+        return counts
 
     def change_agent_direction(self, direction: Direction):
         self.agent_direction = direction
 
     def _update_percepts(self):
-        tiles = self._current_agent_tile_on_board()
-        percepts = Percepts()
-        for tile in tiles:
-            if tile == TileType.GOLD:
-                percepts["glitter"] = True
-            elif tile == TileType.BREEZE:
-                percepts["breeze"] = True
-            elif tile == TileType.STENCH:
-                percepts["stench"] = True
-        self.current_percepts = percepts
+        self.current_percepts = Percepts(self._percepts[self._index(self._agent)])
 
     def act(self, action: Action) -> Percepts:
         """
@@ -82,68 +135,51 @@ class BoardModel:
         ):
             raise Exception(f"Game is over: {self.points} points")
         if action == Action.MOVE:
-            x, y = self._agent.x, self._agent.y
-            if (
-                self._agent == CartesianCoord(x=0, y=0)
-                and self.agent_direction == Direction.DOWN
-            ):
+            if self._agent == (0, 0) and self.agent_direction == Direction.DOWN:
                 self.points += CLIMB_OUT_POINTS
                 self.game_over = GameState.WON
                 print(f"Points: {self.points}")
                 return self.current_percepts
-            if self.agent_direction == Direction.UP:
-                y += 1
-            elif self.agent_direction == Direction.DOWN:
-                y -= 1
-            elif self.agent_direction == Direction.LEFT:
-                x -= 1
-            elif self.agent_direction == Direction.RIGHT:
-                x += 1
-            if 0 <= y < self.board_data.height and 0 <= x < self.board_data.width:
+            dx, dy = DIRECTION_DELTA[self.agent_direction]
+            x, y = self._agent.x + dx, self._agent.y + dy
+            if 0 <= y < self.height and 0 <= x < self.width:
                 self._agent = CartesianCoord(x=x, y=y)
-                y = self.board_data.height - 1 - y
-                x = self._agent.x
                 self.points += MOVE_POINTS
-                tiles = self._current_agent_tile_on_board()
-                percepts = Percepts()
-                remove_gold = False
-                for tile in tiles:
-                    if tile == TileType.GOLD:
-                        self.points += GOLD_POINTS
-                        print(f"Points: {self.points}")
-                        percepts["glitter"] = True
-                        remove_gold = True
-                    elif tile == TileType.PIT:
-                        self.points += PIT_POINTS
-                        self.game_over = GameState.LOST_PIT
-                        print(f"Points: {self.points}")
-                    elif tile == TileType.WUMPUS:
-                        self.points += WUMPUS_POINTS
-                        self.game_over = GameState.LOST_WUMPUS
-                        print(f"Points: {self.points}")
-                    elif tile == TileType.BREEZE:
-                        percepts["breeze"] = True
-                    elif tile == TileType.STENCH:
-                        percepts["stench"] = True
-                if remove_gold:
-                    self.board_data.board_data[y][x].remove(TileType.GOLD)
-                self.current_percepts = percepts
-                return percepts
+                i = (self.height - 1 - y) * self.width + x
+                flags = self._tiles[i]
+                self.current_percepts = Percepts(self._percepts[i])
+                if flags & TILE_BITS[TileType.GOLD]:
+                    self.points += GOLD_POINTS
+                    print(f"Points: {self.points}")
+                    self._write(self._tiles, i, flags & ~TILE_BITS[TileType.GOLD])
+                    self._write(
+                        self._percepts,
+                        i,
+                        self._percepts[i] & ~TILE_PERCEPTS[TileType.GOLD],
+                    )
+                if flags & TILE_BITS[TileType.PIT]:
+                    self.points += PIT_POINTS
+                    self.game_over = GameState.LOST_PIT
+                    print(f"Points: {self.points}")
+                if flags & TILE_BITS[TileType.WUMPUS]:
+                    self.points += WUMPUS_POINTS
+                    self.game_over = GameState.LOST_WUMPUS
+                    print(f"Points: {self.points}")
+                return self.current_percepts
             else:
-                percepts = self.current_percepts
-                percepts["bump"] = True
-                return percepts
+                self.current_percepts = self.current_percepts.with_percept(Percepts.BUMP)
+                return self.current_percepts
         elif action == Action.SHOOT:
             hit = self._shoot()
             self._update_percepts()
             if hit:
-                percepts = self.current_percepts
-                percepts["scream"] = True
-                self.current_percepts = percepts
+                self.current_percepts = self.current_percepts.with_percept(
+                    Percepts.SCREAM
+                )
             return self.current_percepts
 
         elif action == Action.CLIMB:
-            if self._agent == CartesianCoord(x=0, y=0):
+            if self._agent == (0, 0):
                 self.points += CLIMB_OUT_POINTS
                 self.game_over = GameState.WON
                 print(f"Points: {self.points}")
@@ -151,11 +187,66 @@ class BoardModel:
             raise Exception("Cannot climb out: not at (0, 0)")
 
     def _remove_stench_around(self, x: int, y: int):
-        for i in range(0, self.board_data.width):
-            for j in range(0, self.board_data.height):
-                if TileType.STENCH in self.board_data.board_data[j][i]:
-                    self.board_data.board_data[j][i].remove(TileType.STENCH)
-        put_enviroment(self.board_data.board_data)
+        """
+        A wumpus died at (x, y) (row-first top-down), only its neighbours can lose their stench
+        """
+        for nx, ny in self._neighbours(x, y):
+            counts = self._wumpus_around[ny]
+            self._write(counts, nx, counts[nx] - 1)
+            if counts[nx] == 0:
+                i = ny * self.width + nx
+                self._write(self._tiles, i, self._tiles[i] & ~TILE_BITS[TileType.STENCH])
+                self._write(
+                    self._percepts,
+                    i,
+                    self._percepts[i] & ~TILE_PERCEPTS[TileType.STENCH],
+                )
+
+    def _write(self, container, key: int, value: int) -> None:
+        if self._trail is not None:
+            self._trail.append((container, key, container[key]))
+        container[key] = value
+
+    def snapshot(self) -> tuple:
+        """
+        Mark the current state, the board writes are recorded from now on
+
+        Returns:
+            tuple: Snapshot to give to restore
+        """
+        if self._trail is None:
+            self._trail = []
+        return (
+            len(self._trail),
+            self._agent,
+            self.agent_direction,
+            self.points,
+            self.game_over,
+            self.current_percepts,
+        )
+
+    def restore(self, snapshot: tuple) -> None:
+        """
+        Undo every change made since the snapshot
+        """
+        (
+            mark,
+            self._agent,
+            self.agent_direction,
+            self.points,
+            self.game_over,
+            self.current_percepts,
+        ) = snapshot
+        trail = self._trail
+        while len(trail) > mark:
+            container, key, value = trail.pop()
+            container[key] = value
+
+    def release(self) -> None:
+        """
+        Stop recording, the snapshots taken so far cannot be restored anymore
+        """
+        self._trail = None
 
     def model_agent_position(self) -> CartesianCoord:
         """
@@ -171,45 +262,14 @@ class BoardModel:
 
     def _shoot(self) -> bool:
         self.points += ARROW_POINTS
-        match self.agent_direction:
-            case Direction.UP:
-                if self._agent.y >= self.board_data.height - 1:
-                    return False
-                y = self._agent.y + 1
-                y = self.board_data.height - 1 - y
-                if TileType.WUMPUS in self.board_data.board_data[y][self._agent.x]:
-                    self.board_data.board_data[y][self._agent.x].remove(
-                        TileType.WUMPUS
-                    )
-                    self._remove_stench_around(self._agent.x, y)
-                    return True
-            case Direction.DOWN:
-                if self._agent.y <= 0:
-                    return False
-                y = self._agent.y - 1
-                y = self.board_data.height - 1 - y
-                if TileType.WUMPUS in self.board_data.board_data[y][self._agent.x]:
-                    self.board_data.board_data[y][self._agent.x].remove(
-                        TileType.WUMPUS
-                    )
-                    self._remove_stench_around(self._agent.x, y)
-                    return True
-            case Direction.LEFT:
-                if self._agent.x <= 0:
-                    return False
-                y = self.board_data.height - 1 - self._agent.y
-                x = self._agent.x - 1
-                if TileType.WUMPUS in self.board_data.board_data[y][x]:
-                    self.board_data.board_data[y][x].remove(TileType.WUMPUS)
-                    self._remove_stench_around(x, y)
-                    return True
-            case Direction.RIGHT:
-                if self._agent.x >= self.board_data.width - 1:
-                    return False
-                y = self.board_data.height - 1 - self._agent.y
-                x = self._agent.x + 1
-                if TileType.WUMPUS in self.board_data.board_data[y][x]:
-                    self.board_data.board_data[y][x].remove(TileType.WUMPUS)
-                    self._remove_stench_around(x, y)
-                    return True
+        dx, dy = DIRECTION_DELTA[self.agent_direction]
+        x, y = self._agent.x + dx, self._agent.y + dy
+        if not (0 <= y < self.height and 0 <= x < self.width):
+            return False
+        y = self.height - 1 - y
+        i = y * self.width + x
+        if self._tiles[i] & TILE_BITS[TileType.WUMPUS]:
+            self._write(self._tiles, i, self._tiles[i] & ~TILE_BITS[TileType.WUMPUS])
+            self._remove_stench_around(x, y)
+            return True
         return False
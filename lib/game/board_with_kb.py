@@ -1,4 +1,4 @@
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple
 from lib.coord import CartesianCoord
 from lib.game.board_data import BoardData
 from lib.game.board_model import BoardModel, Direction
@@ -11,15 +11,18 @@ class BoardModelWithKB(BoardModel):
     def __init__(self, board_data: BoardData, kb: KnowledgeBase):
         super().__init__(board_data)
         self.kb = kb
+        self._virtual_agent = self._to_virtual(self._agent)
         self.known_tiles: Dict[Tuple[int, int], Cell] = dict()
-        self.known_tiles.update(
-            self.kb.tell(
-                self.virtual_agent_position().x,
-                self.virtual_agent_position().y,
-                self.current_percepts,
-                None,
-            )
+        # Keys added to known_tiles since the first snapshot, None when not recording
+        self._known_trail: List[Tuple[int, int]] | None = None
+        # Cells changed by the last tell
+        self.last_changes = self.kb.tell(
+            self._virtual_agent.x,
+            self._virtual_agent.y,
+            self.current_percepts,
+            None,
         )
+        self.known_tiles.update(self.last_changes)
 
     def known_bounds(self):
         """
@@ -32,20 +35,23 @@ class BoardModelWithKB(BoardModel):
             self.kb.right,
         )
 
-    def virtual_agent_position(self):
-        """
-        Agent position relative to the initial position
-        """
+    def _to_virtual(self, pos: CartesianCoord) -> CartesianCoord:
         return CartesianCoord(
-            x=self._agent.x - self.initial_agent_pos.x,
-            y=self._agent.y - self.initial_agent_pos.y,
+            x=pos.x - self.initial_agent_pos.x,
+            y=pos.y - self.initial_agent_pos.y,
         )
+
+    def virtual_agent_position(self) -> CartesianCoord:
+        """
+        Agent position relative to the initial position, only recomputed when the agent moves
+        """
+        return self._virtual_agent
         
     def adjacent_rooms(self):
         """
         Adjacent rooms of the agent
         """
-        x, y = self.virtual_agent_position().x, self.virtual_agent_position().y
+        x, y = self._virtual_agent
         return [
             (x + 1, y),
             (x - 1, y),
@@ -54,7 +60,7 @@ class BoardModelWithKB(BoardModel):
         ]
         
     def identify_direction_to_modify(self, to_room: Tuple[int, int]) -> Direction:
-        x, y = self.virtual_agent_position().x, self.virtual_agent_position().y
+        x, y = self._virtual_agent
         if to_room == (x, y):
             return self.agent_direction
         if to_room == (x + 1, y):
@@ -73,17 +79,46 @@ class BoardModelWithKB(BoardModel):
         Act in the board
         """
         agent_direction = self.agent_direction
+        agent = self._agent
         percepts = super().act(action)
-        virtual_agent_pos = self.virtual_agent_position()
-        v_x, v_y = virtual_agent_pos.x, virtual_agent_pos.y
-        self.known_tiles.update(
-            self.kb.tell(v_x, v_y, percepts, action=(action, agent_direction))
-        )
+        if self._agent is not agent:
+            self._virtual_agent = self._to_virtual(self._agent)
+        v_x, v_y = self._virtual_agent
+        told = self.kb.tell(v_x, v_y, percepts, action=(action, agent_direction))
+        if self._known_trail is not None:
+            self._known_trail.extend(pos for pos in told if pos not in self.known_tiles)
+        self.known_tiles.update(told)
+        self.last_changes = told
         # print (f"Points: {super().points}")
         # print(self.known_tiles)
         print(percepts)
         return percepts
 
+    def snapshot(self) -> tuple:
+        """
+        Mark the board, the knowledge base and the known tiles together
+        """
+        if self._known_trail is None:
+            self._known_trail = []
+        return (
+            super().snapshot(),
+            self.kb.snapshot(),
+            len(self._known_trail),
+            self._virtual_agent,
+        )
+
+    def restore(self, snapshot: tuple) -> None:
+        board, kb, known, self._virtual_agent = snapshot
+        super().restore(board)
+        self.kb.restore(kb)
+        while len(self._known_trail) > known:
+            del self.known_tiles[self._known_trail.pop()]
+
+    def release(self) -> None:
+        super().release()
+        self.kb.release()
+        self._known_trail = None
+
     def get_known_tiles(self) -> Dict[Tuple[int, int], Cell]:
         """
         Known tiles in perspective of the agent (relative to the initial position)
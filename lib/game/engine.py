@@ -0,0 +1,209 @@
+"""
+Game loop without a display: steps the agent as fast as it can until the game is over.
+
+Nothing here imports pygame, the GUI plugs in as an observer called after each step.
+"""
+
+import contextlib
+import io
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
+
+from lib.agent.agent import Agent
+from lib.agent.algorithms import simulation
+from lib.coord import DownwardCoord
+from lib.game.board_data import BoardData, read_board_data
+from lib.game.board_model import GameState
+from lib.game.board_with_kb import BoardModelWithKB
+from lib.game.map_generator import generate_map
+from lib.knowledge_base.knowledge_base import KnowledgeBase
+
+# When the agent picks the same safe room for 10 times, it will take risk
+# to find way to exit the cave, avoid being stuck in the cave forever
+THRES_HOLD = 28
+
+# Steps a pooled game gets before it is given up, a worker stuck in a loop
+# would otherwise hold up the whole run
+POOL_MAX_STEPS = 10_000
+
+GAME_RESULTS = {
+    GameState.WON: "WON",
+    GameState.LOST_WUMPUS: "EATEN BY WUMPUS",
+    GameState.LOST_PIT: "FELL INTO PIT",
+}
+
+
+def load_board_data(
+    map_path: str | None = None,
+    map_size: Tuple[int, int] | None = None,
+    seed: int = 500,
+    wumpus_count: int | None = None,
+    pit_count: int | None = None,
+    gold_count: int | None = None,
+    initial_agent_pos: DownwardCoord | None = None,
+) -> BoardData:
+    """
+    Map read from map_path, or generated from the other arguments when it is None
+    """
+    if map_path is not None:
+        return read_board_data(map_path)
+    map = generate_map(
+        map_size=map_size,
+        seed=seed,
+        wumpus_count=wumpus_count,
+        pit_count=pit_count,
+        gold_count=gold_count,
+        initial_agent_position=initial_agent_pos,
+    )
+    return map.board_data
+
+
+class Engine:
+    """
+    One game of the agent on a board.
+
+    Args:
+        board_data (BoardData): Map to play on
+        max_steps (int | None, optional): Steps before the game is given up as
+            LOST_UNKNOWN, no limit when None
+    """
+
+    def __init__(self, board_data: BoardData, max_steps: int | None = None) -> None:
+        self.board_data = board_data
+        self.kb = KnowledgeBase()
+        self.board_model = BoardModelWithKB(board_data, self.kb)
+        self.agent = Agent(board=self.board_model)
+        self.max_steps = max_steps
+        self.steps = 0
+        self.take_risk = False
+        self._repeated = 0
+        self._previous_all_safe_rooms = set()
+
+    @property
+    def running(self) -> bool:
+        return self.board_model.game_over == GameState.PLAYING
+
+    def step(self) -> str:
+        """
+        Let the agent make one move
+
+        Returns:
+            str: Text of the move, what the GUI shows
+        """
+        text = simulation(self.agent, self.take_risk)
+        self.steps += 1
+        all_safe_rooms = self.agent.safe_rooms(find_all=True)
+        if all_safe_rooms == self._previous_all_safe_rooms:
+            self._repeated += 1
+            if self._repeated >= THRES_HOLD:
+                self.take_risk = True
+        else:
+            self._repeated = 0
+            self.take_risk = False
+            self._previous_all_safe_rooms = all_safe_rooms
+        return text
+
+    def run(
+        self, observer: Callable[[str], bool | None] | None = None
+    ) -> Tuple[str, int, int]:
+        """
+        Play until the game is over.
+
+        Args:
+            observer (Callable[[str], bool | None] | None, optional): Called with the
+                text of every move, the game stops when it returns False
+
+        Returns:
+            Tuple[str, int, int]: Game result, points and golds picked
+        """
+        try:
+            while self.running:
+                if self.max_steps is not None and self.steps >= self.max_steps:
+                    self.board_model.game_over = GameState.LOST_UNKNOWN
+                    break
+                text = self.step()
+                if observer is not None and observer(text) is False:
+                    break
+        except Exception:
+            self.board_model.game_over = GameState.LOST_UNKNOWN
+        return self.result()
+
+    def result(self) -> Tuple[str, int, int]:
+        game_result = GAME_RESULTS.get(
+            self.board_model.game_over, "LOST BY UNKNOWN REASON"
+        )
+        return (game_result, self.board_model.points, self.agent.golds)
+
+
+def run(
+    map_path: str | None = None,
+    map_size: Tuple[int, int] | None = None,
+    seed: int = 500,
+    wumpus_count: int | None = None,
+    pit_count: int | None = None,
+    gold_count: int | None = None,
+    initial_agent_pos: DownwardCoord | None = None,
+    max_steps: int | None = None,
+) -> Tuple[str, int, int]:
+    """
+    Same as game.run, without a window
+    """
+    board_data = load_board_data(
+        map_path,
+        map_size,
+        seed,
+        wumpus_count,
+        pit_count,
+        gold_count,
+        initial_agent_pos,
+    )
+    return Engine(board_data, max_steps).run()
+
+
+def game_seed(seed: int, index: int) -> int:
+    """
+    Seed of the agent for the index-th game of a run, the same in every process
+    """
+    return random.Random(f"{seed}/{index}").getrandbits(32)
+
+
+def _run_seeded(job: Tuple[int, Dict[str, Any]]) -> Tuple[str, int, int]:
+    seed, kwargs = job
+    random.seed(seed)
+    # Maps print while they are generated, nobody reads a worker's stdout
+    with contextlib.redirect_stdout(io.StringIO()):
+        return run(**kwargs)
+
+
+def run_many(
+    times: int,
+    seed: int = 500,
+    workers: int | None = None,
+    max_steps: int | None = POOL_MAX_STEPS,
+    **kwargs,
+) -> List[Tuple[str, int, int]]:
+    """
+    Play times games on the same map across a process pool.
+
+    Every game seeds the agent with game_seed(seed, index), so the results only
+    depend on the arguments, not on the number of workers or how games are sharded.
+
+    Args:
+        times (int): Number of games
+        seed (int, optional): Seed of the map generator and of the game seeds
+        workers (int | None, optional): Worker processes, the CPU count when None
+        max_steps (int | None, optional): Steps before a game is given up as
+            LOST_UNKNOWN, POOL_MAX_STEPS by default, no limit when None
+        **kwargs: The other arguments of run
+
+    Returns:
+        List[Tuple[str, int, int]]: Result of every game, in game order
+    """
+    workers = workers or os.cpu_count() or 1
+    kwargs = dict(kwargs, seed=seed, max_steps=max_steps)
+    jobs = [(game_seed(seed, i), kwargs) for i in range(times)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunksize = max(1, times // (4 * workers))
+        return list(pool.map(_run_seeded, jobs, chunksize=chunksize))
@@ -1,13 +1,8 @@
 import pygame
-from lib.agent.agent import Agent, AgentState
-from lib.agent.algorithms import simulation
 from lib.coord import DownwardCoord
-from lib.game.board import Board, Direction
-from lib.game.board_data import BoardData, read_board_data
-from lib.game.board_model import Action, BoardModel, GameState
-from lib.game.board_with_kb import BoardModelWithKB
-from lib.game.map_generator import generate_map
-from lib.knowledge_base.knowledge_base import KnowledgeBase
+from lib.game import engine
+from lib.game.board import Board
+from lib.game.engine import Engine, load_board_data
 from rich import print
 from rich.table import Table
 from typing import Dict, Tuple
@@ -16,10 +11,6 @@ from lib.game.board_data import print_map_debug
 
 TILE_SIZE = 48
 
-# When the agent picks the same safe room for 10 times, it will take risk
-# to find way to exit the cave, avoid being stuck in the cave forever
-THRES_HOLD = 28
-
 
 def run(
     map_path: str | None = None,
@@ -31,20 +22,17 @@ def run(
     initial_agent_pos: DownwardCoord | None = None,
 ) -> Tuple[str, int, int]:
     pygame.init()
-    map = generate_map(
-        map_size=map_size,
-        seed=seed,
-        wumpus_count=wumpus_count,
-        pit_count=pit_count,
-        gold_count=gold_count,
-        initial_agent_position=initial_agent_pos,
+    board_data = load_board_data(
+        map_path,
+        map_size,
+        seed,
+        wumpus_count,
+        pit_count,
+        gold_count,
+        initial_agent_pos,
     )
-    board_data = map.board_data
-    if map_path is not None:
-        board_data = read_board_data(map_path)
     x, y = board_data.initial_agent_pos
     print_map_debug(board_data.board_data, (x, y))
-    # assert False
     screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
     s_width, s_height = screen.get_size()
     middle = s_width // 2, s_height // 2
@@ -52,63 +40,25 @@ def run(
         middle[0] - board_data.width * TILE_SIZE // 2,
         middle[1] - board_data.height * TILE_SIZE // 2,
     )
-    kb = KnowledgeBase()
-    board_model = BoardModelWithKB(board_data, kb)
-    agent = Agent(board=board_model)
-    visited_rooms = {(0, 0)}
-    repeated = 0
-    previous_all_safe_rooms = set()
-    take_risk = False
-    board = Board(board_model, board_x, board_y, TILE_SIZE)
+    game_engine = Engine(board_data)
+    board = Board(game_engine.board_model, board_x, board_y, TILE_SIZE)
     clock = pygame.time.Clock()
-    running = True
     font = pygame.font.SysFont("Arial", 32)
-    text = board.model.current_percepts
-    # assert False
-    try:
-        while running:
-            dt = clock.tick(60) / 1000
-            text, new_visited = simulation(
-                agent,
-                visited_rooms,
-                take_risk,
-            )
-            board.update(dt)
-            visited_rooms = new_visited
-            if (
-                board_model.game_over == GameState.WON
-                or board_model.game_over == GameState.LOST_WUMPUS
-                or board_model.game_over == GameState.LOST_PIT
-            ):
-                running = False
-            if agent.safe_rooms(find_all=True) == previous_all_safe_rooms:
-                repeated += 1
-                if repeated >= THRES_HOLD:
-                    take_risk = True
-            else:
-                repeated = 0
-                take_risk = False
-                previous_all_safe_rooms = agent.safe_rooms(find_all=True)
-            screen.fill((0, 0, 0))
-            board.draw(screen)
-            text_rect = font.render(f"{text}", True, (255, 255, 255))
-            screen.blit(text_rect, (0, 0))
-            pygame.display.update()
-    except Exception as e:
-        board_model.game_over = GameState.LOST_UNKNOWN
+
+    def draw(text: str) -> None:
+        dt = clock.tick(60) / 1000
+        board.update(dt)
+        screen.fill((0, 0, 0))
+        board.draw(screen)
+        text_rect = font.render(f"{text}", True, (255, 255, 255))
+        screen.blit(text_rect, (0, 0))
+        pygame.display.update()
+
+    game_result, points, golds = game_engine.run(observer=draw)
     print(board_data)
-    game_result = (
-        "WON"
-        if agent.board.game_over == GameState.WON
-        else "EATEN BY WUMPUS"
-        if agent.board.game_over == GameState.LOST_WUMPUS
-        else "FELL INTO PIT"
-        if agent.board.game_over == GameState.LOST_PIT
-        else "LOST BY UNKNOWN REASON"
-    )
     print(f"Game result: {game_result}")
-    print(f"Agent picks {agent.golds} golds")
-    return (game_result, board_model.points, agent.golds)
+    print(f"Agent picks {golds} golds")
+    return (game_result, points, golds)
 
 
 def _print_summary_table(
@@ -172,19 +122,45 @@ def summary(
     gold_count: int | None = None,
     initial_agent_pos: DownwardCoord | None = None,
     file: str | None = None,
+    headless: bool = False,
+    workers: int | None = None,
 ) -> None:
     """Run the simulation multiple times and return the summary of the results.
 
     Args:
         times (int, optional): Number of times to run the simulation. Defaults to 10.
         seed (int, optional): Seed to set for the map generator. Defaults to 500.
+        headless (bool, optional): Play without a window. Defaults to False.
+        workers (int | None, optional): Play across this many processes, each game
+            with a seed derived from seed. Pooled games have no window, so headless
+            must be True. Defaults to None, one game after the other in this process.
+
+    Raises:
+        ValueError: If workers is given without headless.
 
     Returns:
         Dict[int, Tuple[str, int]]: Summary of the results.
     """
     result: Dict[int, Tuple[str, int, int]] = {}
+    if workers is not None and not headless:
+        raise ValueError("Games played across workers cannot show a window")
+    if workers is not None:
+        games = engine.run_many(
+            times,
+            seed=seed,
+            workers=workers,
+            map_size=map_size,
+            map_path=file,
+            wumpus_count=wumpus_count,
+            pit_count=pit_count,
+            gold_count=gold_count,
+            initial_agent_pos=initial_agent_pos,
+        )
+        result = {i + 1: game_result for i, game_result in enumerate(games)}
+        _print_summary_table(times, result)
+        return
     for i in range(times):
-        game_result = run(
+        game_result = (engine.run if headless else run)(
             seed=seed,
             map_size=map_size,
             map_path=file,
@@ -0,0 +1,165 @@
+"""
+Maps generated once for a range of seeds, kept in one binary corpus file.
+
+Layout, little-endian:
+    header: MAGIC, version (u16), map count (u32)
+    index: one entry per map, see ENTRY
+    tiles: the TileGrid bytes of every map, at the offset of its entry
+"""
+
+import contextlib
+import io
+import mmap
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, NamedTuple, Tuple
+
+from lib.coord import DownwardCoord
+from lib.game.board_data import BoardData, TileGrid
+from lib.game.map_generator import generate_map
+
+MAGIC = b"WMPC"
+VERSION = 1
+HEADER = struct.Struct("<4sHI")
+# offset, seed, width, height, agent x, agent y, wumpus, pit, gold
+ENTRY = struct.Struct("<QqHHHHIII")
+
+
+class CorpusEntry(NamedTuple):
+    offset: int
+    seed: int
+    width: int
+    height: int
+    agent_x: int
+    agent_y: int
+    wumpus_count: int
+    pit_count: int
+    gold_count: int
+
+
+def _generate(args: tuple) -> Tuple[CorpusEntry, bytes]:
+    seed, map_size, initial_agent_position, wumpus_count, pit_count, gold_count = args
+    # generate_map prints the agent position of every map
+    with contextlib.redirect_stdout(io.StringIO()):
+        generated = generate_map(
+            map_size=map_size,
+            initial_agent_position=initial_agent_position,
+            wumpus_count=wumpus_count,
+            pit_count=pit_count,
+            gold_count=gold_count,
+            seed=seed,
+        )
+    board_data = generated.board_data
+    entry = CorpusEntry(
+        0,
+        seed,
+        board_data.width,
+        board_data.height,
+        board_data.initial_agent_pos.x,
+        board_data.initial_agent_pos.y,
+        generated.wumpus_count,
+        generated.pit_count,
+        generated.gold_count,
+    )
+    return entry, bytes(board_data.board_data.data)
+
+
+def build_corpus(
+    filename: str,
+    seeds: range,
+    map_size: Tuple[int, int] | None = None,
+    initial_agent_position: DownwardCoord | None = None,
+    wumpus_count: int | None = None,
+    pit_count: int | None = None,
+    gold_count: int | None = None,
+    workers: int | None = None,
+) -> int:
+    """
+    Generate the maps of a seed range across a process pool and write them to a corpus.
+
+    Maps are written in seed order, each one is exactly generate_map(seed=seed) with
+    the same parameters.
+
+    Args:
+        filename (str): Corpus file to write
+        seeds (range): Seeds of the maps
+        workers (int | None, optional): Worker processes, the CPU count when None
+
+    Returns:
+        int: Number of maps written
+    """
+    jobs = [
+        (seed, map_size, initial_agent_position, wumpus_count, pit_count, gold_count)
+        for seed in seeds
+    ]
+    entries = []
+    offset = HEADER.size + ENTRY.size * len(jobs)
+    with open(filename, "wb") as f, ProcessPoolExecutor(max_workers=workers) as pool:
+        # Tiles go out as they come back, only the index is kept until the end
+        f.seek(offset)
+        for entry, tiles in pool.map(
+            _generate, jobs, chunksize=max(1, len(jobs) // 64)
+        ):
+            entries.append(entry._replace(offset=offset))
+            f.write(tiles)
+            offset += len(tiles)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, len(entries)))
+        for entry in entries:
+            f.write(ENTRY.pack(*entry))
+    return len(entries)
+
+
+class MapCorpus:
+    """
+    Read-only corpus file, memory-mapped: only the index is read when opening, and the
+    tiles of a map are copied out of the mapping when it is asked for.
+    """
+
+    def __init__(self, filename: str) -> None:
+        with open(filename, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f"Not a map corpus: {filename}")
+        if version != VERSION:
+            raise ValueError(f"Unsupported map corpus version: {version}")
+        self.entries = [
+            CorpusEntry(*fields)
+            for fields in struct.iter_unpack(
+                ENTRY.format,
+                self._mmap[HEADER.size : HEADER.size + ENTRY.size * count],
+            )
+        ]
+        self._by_seed = {entry.seed: i for i, entry in enumerate(self.entries)}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __getitem__(self, index: int) -> BoardData:
+        entry = self.entries[index]
+        end = entry.offset + entry.width * entry.height
+        # Every board gets its own tiles, BoardModel writes to them
+        tiles = TileGrid(entry.width, entry.height, bytearray(self._mmap[entry.offset : end]))
+        return BoardData(
+            entry.height,
+            entry.width,
+            tiles,
+            DownwardCoord(entry.agent_x, entry.agent_y),
+        )
+
+    def __iter__(self) -> Iterator[BoardData]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def by_seed(self, seed: int) -> BoardData:
+        return self[self._by_seed[seed]]
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def __enter__(self) -> "MapCorpus":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -1,33 +1,90 @@
-from collections import namedtuple
+from collections import deque, namedtuple
 import random
 from typing import Tuple
 from rich import print
 from lib.coord import DownwardCoord
 
-from lib.game.board_data import BoardData, TileType, put_enviroment
-
-
-def _check_have_path_to_exit(map: list[list[set]], x: int, y: int) -> bool:
-    if TileType.PIT in map[y][x]:
-        return False
-    queue = [(x, y)]
-    visited = set()
-    while len(queue) > 0:
-        x, y = queue.pop(0)
-        if (x, y) in visited:
-            continue
-        visited.add((x, y))
-        if x == 0 and y == len(map) - 1:
-            return True
-        if x > 0 and TileType.PIT not in map[y][x - 1]:
-            queue.append((x - 1, y))
-        if x < len(map[0]) - 1 and TileType.PIT not in map[y][x + 1]:
-            queue.append((x + 1, y))
-        if y > 0 and TileType.PIT not in map[y - 1][x]:
-            queue.append((x, y - 1))
-        if y < len(map) - 1 and TileType.PIT not in map[y + 1][x]:
-            queue.append((x, y + 1))
-    return False
+from lib.game import board_array
+from lib.game.board_data import BoardData, TileGrid, TileType
+
+
+def _critical_tiles(
+    map: list[list[set]], start: Tuple[int, int], exit_tile: Tuple[int, int]
+) -> Tuple[set[Tuple[int, int]], set[Tuple[int, int]]]:
+    """
+    Tiles whose pit would cut the start from the exit, and a path from the start to
+    the exit.
+
+    The critical tiles are the articulation points on the DFS path to the exit: a tile
+    of that path is one when the subtree below it cannot climb above it. They all lie
+    on every path, so a pit off the returned path never cuts anything.
+    """
+    height, width = len(map), len(map[0])
+    passable = [TileType.PIT not in tile for row in map for tile in row]
+    root = start[1] * width + start[0]
+    target = exit_tile[1] * width + exit_tile[0]
+
+    def neighbours(i: int):
+        y, x = divmod(i, width)
+        if x > 0 and passable[i - 1]:
+            yield i - 1
+        if x < width - 1 and passable[i + 1]:
+            yield i + 1
+        if y > 0 and passable[i - width]:
+            yield i - width
+        if y < height - 1 and passable[i + width]:
+            yield i + width
+
+    discovered = [-1] * (width * height)
+    low = [0] * (width * height)
+    parent = [-1] * (width * height)
+    discovered[root] = 0
+    count = 1
+    stack = [(root, neighbours(root))]
+    while stack:
+        i, children = stack[-1]
+        child = next(children, -1)
+        if child == -1:
+            stack.pop()
+            if stack:
+                above = stack[-1][0]
+                if low[i] < low[above]:
+                    low[above] = low[i]
+        elif discovered[child] == -1:
+            discovered[child] = low[child] = count
+            count += 1
+            parent[child] = i
+            stack.append((child, neighbours(child)))
+        elif child != parent[i] and discovered[child] < low[i]:
+            low[i] = discovered[child]
+
+    critical: set[Tuple[int, int]] = set()
+    path: set[Tuple[int, int]] = set()
+    if discovered[target] == -1:
+        return critical, path
+    i = target
+    while i != root:
+        above = parent[i]
+        if above != root and low[i] >= discovered[above]:
+            critical.add((above % width, above // width))
+        i = above
+
+    # The DFS path winds through most of the map, a shortest one is hit far less often
+    parent = [-1] * (width * height)
+    parent[root] = root
+    queue = deque([root])
+    while parent[target] == -1:
+        i = queue.popleft()
+        for child in neighbours(i):
+            if parent[child] == -1:
+                parent[child] = i
+                queue.append(child)
+    i = target
+    while i != root:
+        path.add((i % width, i // width))
+        i = parent[i]
+    path.add(start)
+    return critical, path
 
 
 def _put_tiles(
@@ -37,73 +94,66 @@ def _put_tiles(
     gold_count: int,
     initial_agent_position: DownwardCoord,
 ):
-    current_wumpus_count = 0
-    current_pit_count = 0
-    current_gold_count = 0
-
-    def empty(x, y):
-        return (
-            TileType.WUMPUS not in map[y][x]
-            and TileType.PIT not in map[y][x]
-            and TileType.GOLD not in map[y][x]
+    """
+    Put the wumpuses, pits and golds on distinct random tiles.
+
+    Eligible tiles are listed once and drawn without replacement: nothing goes on the
+    agent's tile, and no wumpus or pit goes on the exit tile (bottom-left).
+    A pit that would cut the agent from the exit is skipped for good, since more pits
+    can only make it worse. The tiles where that happens are kept in a critical set
+    with a path to the exit, recomputed only when a candidate is on that path.
+
+    Raises:
+        ValueError: if the requested counts cannot fit on the map
+    """
+    height, width = len(map), len(map[0])
+    start = (initial_agent_position.x, initial_agent_position.y)
+    exit_tile = (0, height - 1)
+    tiles = [(x, y) for y in range(height) for x in range(width) if (x, y) != start]
+    hazard_tiles = [tile for tile in tiles if tile != exit_tile]
+    if wumpus_count + pit_count > len(hazard_tiles):
+        raise ValueError(
+            f"Cannot put {wumpus_count} wumpus and {pit_count} pits on {len(hazard_tiles)} tiles"
+        )
+    if wumpus_count + pit_count + gold_count > len(tiles):
+        raise ValueError(
+            f"Cannot put {wumpus_count + pit_count + gold_count} objects on {len(tiles)} tiles"
         )
 
-    while True:
-        choice = random.randint(0, 2)
-        if current_wumpus_count < wumpus_count and choice == 0:
-            while True:
-                x = random.randint(0, len(map[0]) - 1)
-                y = random.randint(0, len(map) - 1)
-                if (
-                    empty(x, y)
-                    and (
-                        x != initial_agent_position[0]
-                        and y != initial_agent_position[1]
-                    )
-                    and (x != 0 and y != len(map) - 1)
-                ):
-                    map[y][x].add(TileType.WUMPUS)
-                    current_wumpus_count += 1
-                    break
-        if current_pit_count < pit_count and choice == 1:
-            while True:
-                x = random.randint(0, len(map[0]) - 1)
-                y = random.randint(0, len(map) - 1)
-                if (
-                    empty(x, y)
-                    and (
-                        x != initial_agent_position[0]
-                        and y != initial_agent_position[1]
-                    )
-                    and (x != 0 and y != len(map) - 1)
-                ):
-                    map[y][x].add(TileType.PIT)
-                    if (
-                        _check_have_path_to_exit(
-                            map, initial_agent_position.x, initial_agent_position.y
-                        )
-                        == False
-                    ):
-                        map[y][x].remove(TileType.PIT)
-                        continue
-                    current_pit_count += 1
-                    break
-        if current_gold_count < gold_count and choice == 2:
-            while True:
-                x = random.randint(0, len(map[0]) - 1)
-                y = random.randint(0, len(map) - 1)
-                if empty(x, y) and (
-                    x != initial_agent_position[0] and y != initial_agent_position[1]
-                ):
-                    map[y][x].add(TileType.GOLD)
-                    current_gold_count += 1
-                    break
-        if (
-            current_wumpus_count == wumpus_count
-            and current_pit_count == pit_count
-            and current_gold_count == gold_count
-        ):
+    random.shuffle(hazard_tiles)
+    for x, y in hazard_tiles[:wumpus_count]:
+        map[y][x].add(TileType.WUMPUS)
+    current_pit_count = 0
+    critical, path = _critical_tiles(map, start, exit_tile)
+    stale = False
+    for x, y in hazard_tiles[wumpus_count:]:
+        if current_pit_count == pit_count:
             break
+        if (x, y) in path:
+            # Pits placed off the path since the last pass may have made more tiles critical
+            if stale:
+                critical, path = _critical_tiles(map, start, exit_tile)
+                stale = False
+            if (x, y) in critical:
+                continue
+            map[y][x].add(TileType.PIT)
+            critical, path = _critical_tiles(map, start, exit_tile)
+        else:
+            map[y][x].add(TileType.PIT)
+            stale = True
+        current_pit_count += 1
+    if current_pit_count < pit_count:
+        raise ValueError(
+            f"Cannot put {pit_count} pits without cutting the agent from the exit"
+        )
+
+    free_tiles = [
+        (x, y)
+        for x, y in tiles
+        if TileType.WUMPUS not in map[y][x] and TileType.PIT not in map[y][x]
+    ]
+    for x, y in random.sample(free_tiles, gold_count):
+        map[y][x].add(TileType.GOLD)
 
 
 def generate_map(
@@ -120,7 +170,7 @@ def generate_map(
     if map_size is None:
         map_size = (random.randint(4, 10), random.randint(4, 10))
 
-    map = [[set() for _ in range(map_size[0])] for _ in range(map_size[1])]
+    map = TileGrid(map_size[0], map_size[1])
 
     if wumpus_count is None:
         wumpus_count = random.randint(1, int(map_size[0] * map_size[1] / 5))
@@ -138,14 +188,16 @@ def generate_map(
         )
     print(initial_agent_position)
 
-    _put_tiles(
-        map,
-        wumpus_count,
-        pit_count,
-        gold_count,
-        initial_agent_position,
-    )
-    random.setstate(previous_seed)
+    try:
+        _put_tiles(
+            map,
+            wumpus_count,
+            pit_count,
+            gold_count,
+            initial_agent_position,
+        )
+    finally:
+        random.setstate(previous_seed)
 
     Result = namedtuple(
         "Map",
@@ -156,7 +208,8 @@ def generate_map(
             "gold_count",
         ],
     )
-    put_enviroment(map)
+    # to_array is a view on the grid's bytearray, so this fills map in place
+    board_array.put_enviroment_array(board_array.to_array(map))
     board_data = BoardData(
         height=len(map),
         width=len(map[0]),
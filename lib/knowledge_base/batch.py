@@ -0,0 +1,176 @@
+"""
+The WorldView rules run over the knowledge bases of many games at once.
+
+Every predicate is one (n, size, size) array of CellValue codes, covering the same
+window as the bitboard: x and y from low to high, rule centres in span.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+from lib.game.board_array import around
+from lib.game.board_model import Direction
+from lib.knowledge_base.cell import IMPLIES, CellValue, Predicate
+
+_T = CellValue.TRUE.value
+_F = CellValue.FALSE.value
+_M = CellValue.MAYBE.value
+_U = CellValue.UNKNOWN.value
+# Bound of a side with no known wall
+_NO_BOUND = 1 << 30
+
+
+class BatchWorldView:
+    """
+    n world views inferred together with whole-array neighbour operations.
+
+    The fixpoint of infer() is the one WorldView reaches for the same facts, cell for
+    cell, as long as the games stay inside the window.
+
+    Args:
+        n (int): Number of games
+    """
+
+    low = -12
+    high = 10
+    span = range(-11, 10)
+
+    def __init__(self, n: int) -> None:
+        self.n = n
+        self.size = self.high - self.low + 1
+        # values[predicate][game, y - low, x - low]
+        self.values = np.full((len(Predicate), n, self.size, self.size), _U, np.uint8)
+        self.top = np.full(n, _NO_BOUND)
+        self.right = np.full(n, _NO_BOUND)
+        self.bottom = np.full(n, -_NO_BOUND)
+        self.left = np.full(n, -_NO_BOUND)
+        coords = np.arange(self.low, self.high + 1)
+        self._ys = coords[:, None]
+        self._xs = coords[None, :]
+        inside = (coords >= self.span.start) & (coords < self.span.stop)
+        self._centres = inside[:, None] & inside[None, :]
+
+    def oob(self) -> np.ndarray:
+        """
+        (n, size, size) cells beyond a known wall
+        """
+        return (
+            (self._ys > self.top[:, None, None])
+            | (self._xs > self.right[:, None, None])
+            | (self._ys < self.bottom[:, None, None])
+            | (self._xs < self.left[:, None, None])
+        )
+
+    def state(self, game: int, x: int, y: int) -> Tuple[CellValue, ...]:
+        """
+        Same as WorldView[(x, y)].state() for one game
+        """
+        if self.oob()[game, y - self.low, x - self.low]:
+            return (
+                CellValue.FALSE,
+                CellValue.FALSE,
+                CellValue.FALSE,
+                CellValue.UNKNOWN,
+                CellValue.UNKNOWN,
+            )
+        return tuple(
+            CellValue(self.values[predicate, game, y - self.low, x - self.low])
+            for predicate in Predicate
+        )
+
+    def assign(
+        self,
+        games: np.ndarray,
+        x: np.ndarray,
+        y: np.ndarray,
+        key: Predicate | str,
+        value: CellValue | bool,
+    ) -> None:
+        """
+        Write one predicate on a cell of each game, like WorldView.set_items before it
+        infers. Cells beyond a wall are skipped.
+        """
+        games, x, y = np.asarray(games), np.asarray(x), np.asarray(y)
+        keep = ~self.oob()[games, y - self.low, x - self.low]
+        index = (games[keep], y[keep] - self.low, x[keep] - self.low)
+        if key == "is_safe":
+            if value:
+                self.values[Predicate.WUMPUS][index] = _F
+                self.values[Predicate.PIT][index] = _F
+            return
+        predicate = key if isinstance(key, Predicate) else Predicate.of(key)
+        value = CellValue(value)
+        self.values[predicate][index] = value
+        for other, implied in IMPLIES[predicate][value]:
+            self.values[other][index] = implied
+
+    def set_bound(self, games: np.ndarray, direction: Direction, value: np.ndarray) -> None:
+        match direction:
+            case Direction.UP:
+                self.top[games] = value
+            case Direction.RIGHT:
+                self.right[games] = value
+            case Direction.DOWN:
+                self.bottom[games] = value
+            case Direction.LEFT:
+                self.left[games] = value
+        # The rules read the arrays directly, so the wall is written into them
+        oob = self.oob()
+        for predicate in (Predicate.WUMPUS, Predicate.PIT, Predicate.GOLD):
+            self.values[predicate][oob] = _F
+
+    def infer(self) -> np.ndarray:
+        """
+        Run the rules of every game until no cell changes anymore
+
+        Returns:
+            np.ndarray: (n, size, size) cells changed by the inference
+        """
+        before = self.values.copy()
+        centres = self._centres & ~self.oob()
+        inside = ~self.oob()
+        while True:
+            snapshot = self.values.copy()
+            self._infer_once(centres, inside)
+            if np.array_equal(self.values, snapshot):
+                break
+        return np.any(self.values != before, axis=0)
+
+    def _infer_once(self, centres: np.ndarray, inside: np.ndarray) -> None:
+        values = self.values
+        stench, breeze = values[Predicate.STENCH], values[Predicate.BREEZE]
+        empty = (stench == _F) & (breeze == _F) & centres
+        safe = around(empty) & inside
+        values[Predicate.WUMPUS][safe] = _F
+        values[Predicate.PIT][safe] = _F
+        self._infer_predicate(Predicate.STENCH, Predicate.WUMPUS, Predicate.PIT, centres, inside)
+        self._infer_predicate(Predicate.BREEZE, Predicate.PIT, Predicate.WUMPUS, centres, inside)
+
+    def _infer_predicate(
+        self,
+        percept: Predicate,
+        predicate: Predicate,
+        other: Predicate,
+        centres: np.ndarray,
+        inside: np.ndarray,
+    ) -> None:
+        values = self.values
+        sensed = (values[percept] == _T) & centres
+        not_sensed = (values[percept] == _F) & centres
+        target = values[predicate]
+        target[around(not_sensed) & inside] = _F
+        target[around(sensed) & (target == _U) & inside] = _M
+
+        # Centres with exactly three ruled out neighbours
+        ruled_out = (target == _F).astype(np.int8)
+        count = np.zeros_like(ruled_out)
+        count[..., 1:, :] += ruled_out[..., :-1, :]
+        count[..., :-1, :] += ruled_out[..., 1:, :]
+        count[..., :, 1:] += ruled_out[..., :, :-1]
+        count[..., :, :-1] += ruled_out[..., :, 1:]
+        found = around(sensed & (count == 3)) & (target == _M) & inside
+        target[found] = _T
+        # A wumpus cannot share a room with a pit or the gold
+        values[other][found] = _F
+        values[Predicate.GOLD][found] = _F
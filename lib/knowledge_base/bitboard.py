@@ -0,0 +1,245 @@
+from typing import Any, Dict, Iterator, List, Tuple
+
+from lib.game.board_model import Direction
+from lib.knowledge_base.cell import IMPLIES, Cell, CellValue, Predicate
+from lib.knowledge_base.world_view import WorldView
+
+# Predicates stored by the bitboard, in the order of the mask table
+GOLD = Predicate.GOLD
+WUMPUS = Predicate.WUMPUS
+PIT = Predicate.PIT
+STENCH = Predicate.STENCH
+BREEZE = Predicate.BREEZE
+
+# Truth values with a mask of their own, UNKNOWN is the absence of all of them
+_VALUES = (CellValue.TRUE, CellValue.FALSE, CellValue.MAYBE)
+_T, _F, _M = 0, 1, 2
+
+
+class BitboardWorldData:
+    """
+    World store keeping one packed bitmask per predicate and truth value.
+
+    Cells are numbered row by row, from (low, low) to (high, high), with one guard
+    column per row so that shifting a mask by one bit never wraps to the next row.
+    """
+
+    low = -12
+    high = 10
+
+    def __init__(self) -> None:
+        self.size = self.high - self.low + 1
+        self.stride = self.size + 1
+        self.board = 0
+        for row in range(self.size):
+            self.board |= ((1 << self.size) - 1) << (row * self.stride)
+        # masks[predicate][value]
+        self.masks: List[List[int]] = [[0, 0, 0] for _ in range(5)]
+
+    def bit(self, pos: Tuple[int, int]) -> int:
+        x, y = pos
+        if not (self.low <= x <= self.high and self.low <= y <= self.high):
+            raise IndexError(f"Cell out of the bitboard: {pos}")
+        return 1 << ((y - self.low) * self.stride + (x - self.low))
+
+    def pos(self, index: int) -> Tuple[int, int]:
+        y, x = divmod(index, self.stride)
+        return (x + self.low, y + self.low)
+
+    def positions(self, mask: int):
+        while mask:
+            low = mask & -mask
+            yield self.pos(low.bit_length() - 1)
+            mask ^= low
+
+    def items(self) -> Iterator[Tuple[Tuple[int, int], Cell]]:
+        for pos in self.positions(self.board):
+            yield pos, self[pos]
+
+    def read(self, predicate: int, bit: int) -> CellValue:
+        masks = self.masks[predicate]
+        for i in range(3):
+            if masks[i] & bit:
+                return _VALUES[i]
+        return CellValue.UNKNOWN
+
+    def write(self, predicate: int, mask: int, value: CellValue) -> None:
+        masks = self.masks[predicate]
+        for i in range(3):
+            masks[i] &= ~mask
+        if value != CellValue.UNKNOWN:
+            masks[_VALUES.index(value)] |= mask
+
+    def row(self, y: int) -> int:
+        return ((1 << self.size) - 1) << ((y - self.low) * self.stride)
+
+    def column(self, x: int) -> int:
+        mask = 0
+        for row in range(self.size):
+            mask |= 1 << (row * self.stride + x - self.low)
+        return mask
+
+    def neighbours(self, mask: int) -> int:
+        """
+        Cells next to any cell of the mask
+        """
+        return (
+            (mask << 1) | (mask >> 1) | (mask << self.stride) | (mask >> self.stride)
+        ) & self.board
+
+    def __getitem__(self, pos: Tuple[int, int]) -> Cell:
+        return BitCell(self, self.bit(pos))
+
+    def get(self, pos: Tuple[int, int]) -> Cell | None:
+        return self[pos]
+
+    def __setitem__(self, pos: Tuple[int, int], cell: Cell) -> None:
+        BitCell(self, self.bit(pos)).copy_from(cell)
+
+    def __repr__(self) -> str:
+        return f"BitboardWorldData({self.masks})"
+
+
+class BitCell(Cell):
+    """
+    Cell view over one bit of a BitboardWorldData, the Cell rules are inherited as-is
+    """
+
+    __slots__ = ("_data", "_bit")
+
+    def __init__(self, data: BitboardWorldData, bit: int) -> None:
+        self._data = data
+        self._bit = bit
+
+    def copy_from(self, cell: Cell) -> None:
+        for predicate in Predicate:
+            self._data.write(predicate, self._bit, cell.get(predicate))
+
+    def get(self, predicate: Predicate) -> CellValue:
+        return self._data.read(predicate, self._bit)
+
+    def set(self, predicate: Predicate, value: CellValue) -> None:
+        self._data.write(predicate, self._bit, value)
+        for other, implied in IMPLIES[predicate][value]:
+            self._data.write(other, self._bit, implied)
+
+    def state(self) -> Tuple[CellValue, ...]:
+        return tuple(self.get(predicate) for predicate in Predicate)
+
+    def restore(self, state: Tuple[CellValue, ...]) -> None:
+        for predicate, value in zip(Predicate, state):
+            self._data.write(predicate, self._bit, value)
+
+
+class BitboardWorldView(WorldView):
+    """
+    WorldView over a BitboardWorldData, the stench/breeze rules run on whole masks
+    """
+
+    span = range(-11, 10)
+
+    def __init__(self) -> None:
+        super().__init__(BitboardWorldData())
+        data = self.cells
+        self.centres = 0
+        for y in self.span:
+            for x in self.span:
+                self.centres |= data.bit((x, y))
+
+    def set_bound(self, direction: Direction, value: int) -> None:
+        data: BitboardWorldData = self.cells
+        self._record("masks", data, [list(masks) for masks in data.masks])
+        super().set_bound(direction, value)
+        match direction:
+            case Direction.UP:
+                lines = [data.row(y) for y in range(value + 1, data.high + 1)]
+            case Direction.RIGHT:
+                lines = [data.column(x) for x in range(value + 1, data.high + 1)]
+            case Direction.DOWN:
+                lines = [data.row(y) for y in range(data.low, value)]
+            case Direction.LEFT:
+                lines = [data.column(x) for x in range(data.low, value)]
+        # The masks are read directly by the rules, so the wall is written into them
+        beyond = 0
+        for line in lines:
+            beyond |= line
+        data.write(WUMPUS, beyond, CellValue.FALSE)
+        data.write(PIT, beyond, CellValue.FALSE)
+        data.write(GOLD, beyond, CellValue.FALSE)
+
+    def infer(self) -> Dict[Tuple[int, int], Any]:
+        self._worklist.clear()
+        self._queued.clear()
+        data: BitboardWorldData = self.cells
+        before = [list(masks) for masks in data.masks]
+        while True:
+            snapshot = [list(masks) for masks in data.masks]
+            self._infer_masks(data)
+            if data.masks == snapshot:
+                break
+        changed = 0
+        for predicate in range(5):
+            for i in range(3):
+                changed |= before[predicate][i] ^ data.masks[predicate][i]
+        res: Dict[Tuple[int, int], Any] = {}
+        for pos in data.positions(changed):
+            if self._trail is not None:
+                self._trail.append(("cell", pos, self._state_in(before, data.bit(pos))))
+            res[pos] = data[pos]
+            self._index(pos, res[pos])
+        return res
+
+    @staticmethod
+    def _state_in(masks: List[List[int]], bit: int) -> Tuple[CellValue, ...]:
+        state = []
+        for predicate in Predicate:
+            value = CellValue.UNKNOWN
+            for i in range(3):
+                if masks[predicate][i] & bit:
+                    value = _VALUES[i]
+            state.append(value)
+        return tuple(state)
+
+    def _undo(self, kind: str, a: Any, b: Any) -> None:
+        if kind == "masks":
+            a.masks = b
+        else:
+            super()._undo(kind, a, b)
+
+    def _infer_masks(self, data: BitboardWorldData) -> None:
+        masks = data.masks
+        stench, breeze = masks[STENCH], masks[BREEZE]
+        empty = stench[_F] & breeze[_F] & self.centres
+        safe = data.neighbours(empty)
+        data.write(WUMPUS, safe, CellValue.FALSE)
+        data.write(PIT, safe, CellValue.FALSE)
+        self._infer_predicate(data, STENCH, WUMPUS, PIT)
+        self._infer_predicate(data, BREEZE, PIT, WUMPUS)
+
+    def _infer_predicate(
+        self, data: BitboardWorldData, percept: int, predicate: int, other: int
+    ) -> None:
+        stride = data.stride
+        sensed = data.masks[percept][_T] & self.centres
+        not_sensed = data.masks[percept][_F] & self.centres
+        data.write(predicate, data.neighbours(not_sensed), CellValue.FALSE)
+
+        values = data.masks[predicate]
+        unknown = data.board & ~(values[_T] | values[_F] | values[_M])
+        data.write(predicate, data.neighbours(sensed) & unknown, CellValue.MAYBE)
+
+        # Centres with exactly three ruled out neighbours
+        ruled_out = values[_F]
+        sides = [ruled_out >> 1, ruled_out << 1, ruled_out >> stride, ruled_out << stride]
+        exactly_three = 0
+        for i in range(4):
+            others = data.board
+            for j in range(4):
+                if j != i:
+                    others &= sides[j]
+            exactly_three |= others & ~sides[i]
+        found = data.neighbours(sensed & exactly_three) & values[_M]
+        data.write(predicate, found, CellValue.TRUE)
+        # A wumpus cannot share a room with a pit or the gold
+        data.write(other, found, CellValue.FALSE)
+        data.write(GOLD, found, CellValue.FALSE)
@@ -1,9 +1,8 @@
-from enum import Enum
-from logging import raiseExceptions
-from typing import Any
+from enum import IntEnum
+from typing import Dict, List, Tuple
 
 
-class CellValue(Enum):
+class CellValue(IntEnum):
     TRUE = 1
     FALSE = 2
     MAYBE = 3
@@ -22,7 +21,7 @@ class CellValue(Enum):
 
     def __repr__(self) -> str:
         return str(self)
-    
+
     @staticmethod
     def negate(value: "CellValue") -> "CellValue":
         match value:
@@ -36,17 +35,71 @@ class CellValue(Enum):
                 return CellValue.UNKNOWN
 
 
+class Predicate(IntEnum):
+    """
+    Predicates of a cell, each one is the index of its value in Cell.values
+    """
+
+    GOLD = 0
+    WUMPUS = 1
+    PIT = 2
+    STENCH = 3
+    BREEZE = 4
+
+    @staticmethod
+    def of(name: str) -> "Predicate":
+        return _NAMES[name]
+
+
+_NAMES: Dict[str, Predicate] = {
+    "is_gold": Predicate.GOLD,
+    "is_wumpus": Predicate.WUMPUS,
+    "is_pit": Predicate.PIT,
+    "is_stench": Predicate.STENCH,
+    "is_breeze": Predicate.BREEZE,
+}
+
+# IMPLIES[predicate][value]: values forced on the other predicates of the same cell
+IMPLIES: List[List[Tuple[Tuple[Predicate, CellValue], ...]]] = [
+    [() for _ in range(len(CellValue) + 1)] for _ in Predicate
+]
+IMPLIES[Predicate.WUMPUS][CellValue.TRUE] = (
+    (Predicate.PIT, CellValue.FALSE),
+    (Predicate.GOLD, CellValue.FALSE),
+)
+IMPLIES[Predicate.PIT][CellValue.TRUE] = (
+    (Predicate.WUMPUS, CellValue.FALSE),
+    (Predicate.GOLD, CellValue.FALSE),
+)
+
+
 class Cell:
+    __slots__ = ("values",)
+
     def __init__(self) -> None:
-        self.is_gold: CellValue = CellValue.UNKNOWN
-        self._is_wumpus: CellValue = CellValue.UNKNOWN
-        self._is_pit: CellValue = CellValue.UNKNOWN
-        self.is_stench: CellValue = CellValue.UNKNOWN
-        self.is_breeze: CellValue = CellValue.UNKNOWN
+        self.values: List[CellValue] = [CellValue.UNKNOWN] * len(Predicate)
 
     def __repr__(self) -> str:
         return f"(G: {self.is_gold}, W: {self.is_wumpus}, P: {self.is_pit}, S: {self.is_stench}, B: {self.is_breeze})"
 
+    def get(self, predicate: Predicate) -> CellValue:
+        return self.values[predicate]
+
+    def set(self, predicate: Predicate, value: CellValue) -> None:
+        values = self.values
+        values[predicate] = value
+        for other, implied in IMPLIES[predicate][value]:
+            values[other] = implied
+
+    def state(self) -> Tuple[CellValue, ...]:
+        return tuple(self.values)
+
+    def restore(self, state: Tuple[CellValue, ...]) -> None:
+        """
+        Put back a state() as-is, without the implications of set
+        """
+        self.values[:] = state
+
     @property
     def is_empty(self):
         match (self.is_breeze, self.is_stench):
@@ -65,8 +118,8 @@ class Cell:
     @is_safe.setter
     def is_safe(self, value: bool):
         if value:
-            self.is_wumpus = CellValue.FALSE
-            self.is_pit = CellValue.FALSE
+            self.set(Predicate.WUMPUS, CellValue.FALSE)
+            self.set(Predicate.PIT, CellValue.FALSE)
 
     @property
     def is_oob(self):
@@ -75,31 +128,49 @@ class Cell:
     @is_oob.setter
     def is_oob(self, value: bool):
         if value:
-            self._is_wumpus = CellValue.FALSE
-            self._is_pit = CellValue.FALSE
-            self.is_gold = CellValue.FALSE
+            self.set(Predicate.WUMPUS, CellValue.FALSE)
+            self.set(Predicate.PIT, CellValue.FALSE)
+            self.set(Predicate.GOLD, CellValue.FALSE)
+
+    @property
+    def is_gold(self):
+        return self.get(Predicate.GOLD)
+
+    @is_gold.setter
+    def is_gold(self, value):
+        self.set(Predicate.GOLD, value)
 
     @property
     def is_wumpus(self):
-        return self._is_wumpus
+        return self.get(Predicate.WUMPUS)
 
     @is_wumpus.setter
     def is_wumpus(self, value):
-        self._is_wumpus = value
-        if value == CellValue.TRUE:
-            self.is_pit = CellValue.FALSE
-            self.is_gold = CellValue.FALSE
+        self.set(Predicate.WUMPUS, value)
 
     @property
     def is_pit(self):
-        return self._is_pit
+        return self.get(Predicate.PIT)
 
     @is_pit.setter
     def is_pit(self, value):
-        self._is_pit = value
-        if value == CellValue.TRUE:
-            self.is_wumpus = CellValue.FALSE
-            self.is_gold = CellValue.FALSE
+        self.set(Predicate.PIT, value)
+
+    @property
+    def is_stench(self):
+        return self.get(Predicate.STENCH)
+
+    @is_stench.setter
+    def is_stench(self, value):
+        self.set(Predicate.STENCH, value)
+
+    @property
+    def is_breeze(self):
+        return self.get(Predicate.BREEZE)
+
+    @is_breeze.setter
+    def is_breeze(self, value):
+        self.set(Predicate.BREEZE, value)
 
     @property
     def is_glitter(self):
@@ -110,4 +181,4 @@ class Cell:
         if value == CellValue.TRUE:
             self.is_gold = CellValue.TRUE
         else:
-            self.is_gold = CellValue.FALSE
\ No newline at end of file
+            self.is_gold = CellValue.FALSE
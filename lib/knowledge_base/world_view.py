@@ -1,160 +1,355 @@
-from typing import Any, Dict, List, Tuple
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, Set, Tuple
 from lib.game.board_model import Direction
 from rich import print
 
-from lib.knowledge_base.cell import Cell, CellValue
+from lib.knowledge_base.cell import Cell, CellValue, Predicate
+
+
+def _write(cell: Cell, key: Predicate | str, value: CellValue | bool) -> None:
+    """
+    Write a predicate of a cell. Names are still accepted, "is_safe" included
+    """
+    if key.__class__ is Predicate:
+        cell.set(key, value)
+    elif key == "is_safe":
+        cell.is_safe = value
+    else:
+        cell.set(Predicate.of(key), value)
+
+
+def _out_of_bounds_cell() -> Cell:
+    cell = Cell()
+    cell.is_oob = True
+    return cell
 
 
 class WorldData:
+    """
+    Sparse world store: cells live in square chunks that are created on first access,
+    so memory grows with the explored area and not with the size of the cave.
+    """
+
+    chunk_bits = 3
+    chunk_size = 1 << chunk_bits
+
     def __init__(self) -> None:
-        self.cells: List[List[Cell]] = []
-        for i in range(22):
-            self.cells.append([])
-            for _ in range(22):
-                self.cells[i].append(Cell())
+        self.chunks: Dict[Tuple[int, int], List[Cell]] = {}
+
+    def _chunk(self, x: int, y: int) -> List[Cell]:
+        key = (x >> self.chunk_bits, y >> self.chunk_bits)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = [Cell() for _ in range(self.chunk_size * self.chunk_size)]
+            self.chunks[key] = chunk
+        return chunk
+
+    def _offset(self, x: int, y: int) -> int:
+        mask = self.chunk_size - 1
+        return (y & mask) * self.chunk_size + (x & mask)
 
     def __getitem__(self, pos: Tuple[int, int]) -> Cell:
         x, y = pos
-        return self.cells[-y - 11][x + 11]
+        return self._chunk(x, y)[self._offset(x, y)]
 
     def __setitem__(self, pos: Tuple[int, int], cell: Cell) -> None:
         x, y = pos
-        self.cells[-y - 11][x + 11] = cell
+        self._chunk(x, y)[self._offset(x, y)] = cell
+
+    def get(self, pos: Tuple[int, int]) -> Cell | None:
+        """
+        Cell at pos, or None if its chunk has not been materialised yet
+        """
+        x, y = pos
+        chunk = self.chunks.get((x >> self.chunk_bits, y >> self.chunk_bits))
+        if chunk is None:
+            return None
+        return chunk[self._offset(x, y)]
+
+    def items(self) -> Iterator[Tuple[Tuple[int, int], Cell]]:
+        """
+        Cells of the materialised chunks only
+        """
+        for (cx, cy), chunk in list(self.chunks.items()):
+            for i, cell in enumerate(chunk):
+                oy, ox = divmod(i, self.chunk_size)
+                yield (
+                    (cx << self.chunk_bits) + ox,
+                    (cy << self.chunk_bits) + oy,
+                ), cell
 
     def __repr__(self) -> str:
-        return repr(self.cells)
+        return repr(self.chunks)
 
 
 class WorldView:
     kx = [1, -1, 0, 0]
     ky = [0, 0, 1, -1]
+    # Window of rule centres inferred over, None for an unbounded world
+    span: range | None = None
 
-    def __init__(self) -> None:
-        self.cells = WorldData()
+    def __init__(self, cells: WorldData | None = None) -> None:
+        self.cells = cells if cells is not None else WorldData()
+        # Cells whose stench/breeze rules have to be re-evaluated
+        self._worklist: Deque[Tuple[int, int]] = deque()
+        self._queued: Set[Tuple[int, int]] = set()
+        # Indexes kept up to date on every change of a cell
+        self.safe: Set[Tuple[int, int]] = set()
+        self.wumpus: Dict[CellValue, Set[Tuple[int, int]]] = {
+            CellValue.TRUE: set(),
+            CellValue.MAYBE: set(),
+        }
+        self.pit: Dict[CellValue, Set[Tuple[int, int]]] = {
+            CellValue.TRUE: set(),
+            CellValue.MAYBE: set(),
+        }
+        # Cells with a stench or a breeze, whose rules may wait for a bound
+        self.sensed: Set[Tuple[int, int]] = set()
+        # Known walls, cells beyond them are answered without being stored
+        self.top: int | None = None
+        self.right: int | None = None
+        self.bottom: int | None = None
+        self.left: int | None = None
+        # Undo records since the first snapshot, None when not recording
+        self._trail: List[Tuple[str, Any, Any]] | None = None
 
     def __str__(self) -> str:
         return str(self.cells)
 
     def __getitem__(self, pos: Tuple[int, int]) -> Cell:
+        if self.is_oob(pos[0], pos[1]):
+            return _out_of_bounds_cell()
         return self.cells[pos]
 
+    def is_oob(self, x: int, y: int) -> bool:
+        if self.top != None and y > self.top:
+            return True
+        if self.right != None and x > self.right:
+            return True
+        if self.bottom != None and y < self.bottom:
+            return True
+        if self.left != None and x < self.left:
+            return True
+        return False
+
+    def in_bounds(self, cells: Set[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """
+        Cells of an index that are not known to be outside, the others are dropped from it
+        """
+        res: List[Tuple[int, int]] = []
+        outside: List[Tuple[int, int]] = []
+        for pos in cells:
+            if self.is_oob(pos[0], pos[1]):
+                outside.append(pos)
+            else:
+                res.append(pos)
+        if outside:
+            cells.difference_update(outside)
+            self._record("dropped", cells, outside)
+        return res
+
+    def mark_dirty(self, x: int, y: int) -> None:
+        """
+        Queue the rules that read cell (x, y): its own rule and the rules of its neighbours
+        """
+        for pos in [(x, y)] + [(x + self.kx[i], y + self.ky[i]) for i in range(4)]:
+            if pos in self._queued:
+                continue
+            if self.span is not None and (
+                pos[0] not in self.span or pos[1] not in self.span
+            ):
+                continue
+            if self.is_oob(pos[0], pos[1]):
+                continue
+            self._queued.add(pos)
+            self._worklist.append(pos)
+
+    def _index(self, pos: Tuple[int, int], cell: Cell) -> None:
+        if cell.is_safe:
+            self.safe.add(pos)
+        else:
+            self.safe.discard(pos)
+        wumpus = cell.get(Predicate.WUMPUS)
+        for value, cells in self.wumpus.items():
+            if wumpus == value:
+                cells.add(pos)
+            else:
+                cells.discard(pos)
+        pit = cell.get(Predicate.PIT)
+        for value, cells in self.pit.items():
+            if pit == value:
+                cells.add(pos)
+            else:
+                cells.discard(pos)
+        if (
+            cell.get(Predicate.STENCH) == CellValue.TRUE
+            or cell.get(Predicate.BREEZE) == CellValue.TRUE
+        ):
+            self.sensed.add(pos)
+        else:
+            self.sensed.discard(pos)
+
+    def _assign(
+        self,
+        x: int,
+        y: int,
+        key: Predicate | str,
+        value: CellValue | bool,
+        res: Dict[Tuple[int, int], Any],
+    ) -> None:
+        if self.is_oob(x, y):
+            return
+        cell = self.cells[(x, y)]
+        before = cell.state()
+        _write(cell, key, value)
+        if cell.state() != before:
+            self._record("cell", (x, y), before)
+            res[(x, y)] = cell
+            self._index((x, y), cell)
+            self.mark_dirty(x, y)
+
     def infer(self) -> Dict[Tuple[int, int], Any]:
+        """
+        Run the rules of the queued cells until no cell changes anymore
+
+        Returns:
+            Dict[Tuple[int, int], Any]: Cells changed by the inference
+        """
         res: Dict[Tuple[int, int], Any] = {}
-        for y in range(-11, 10):
-            for x in range(-11, 10):
-                if self.cells[(x, y)].is_empty == True:
-                    for i in range(4):
-                        self.cells[(x + self.kx[i], y + self.ky[i])].is_safe = True
-                        res[(x + self.kx[i], y + self.ky[i])] = self.cells[
-                            (x + self.kx[i], y + self.ky[i])
-                        ]
-                if self.cells[(x, y)].is_stench == CellValue.TRUE:
-                    not_wumpus_cnt = 0
-                    for i in range(4):
-                        if (
-                            self.cells[(x + self.kx[i], y + self.ky[i])].is_wumpus
-                            == CellValue.FALSE
-                        ):
-                            not_wumpus_cnt += 1
-                        if (
-                            self.cells[(x + self.kx[i], y + self.ky[i])].is_wumpus
-                            == CellValue.UNKNOWN
-                        ):
-                            self.cells[
-                                (x + self.kx[i], y + self.ky[i])
-                            ].is_wumpus = CellValue.MAYBE
-                            res[(x + self.kx[i], y + self.ky[i])] = self.cells[
-                                (x + self.kx[i], y + self.ky[i])
-                            ]
-
-                    if not_wumpus_cnt == 3:
-                        for i in range(4):
-                            if (
-                                self.cells[(x + self.kx[i], y + self.ky[i])].is_wumpus
-                                == CellValue.MAYBE
-                            ):
-                                self.cells[
-                                    (x + self.kx[i], y + self.ky[i])
-                                ].is_wumpus = CellValue.TRUE
-                                res[(x + self.kx[i], y + self.ky[i])] = self.cells[
-                                    (x + self.kx[i], y + self.ky[i])
-                                ]
-                if self.cells[(x, y)].is_stench == CellValue.FALSE:
-                    for i in range(4):
-                        self.cells[
-                            (x + self.kx[i], y + self.ky[i])
-                        ].is_wumpus = CellValue.FALSE
-                        res[(x + self.kx[i], y + self.ky[i])] = self.cells[
-                            (x + self.kx[i], y + self.ky[i])
-                        ]
-                if self.cells[(x, y)].is_breeze == CellValue.TRUE:
-                    not_pit_cnt = 0
-                    for i in range(4):
-                        if (
-                            self.cells[(x + self.kx[i], y + self.ky[i])].is_pit
-                            == CellValue.FALSE
-                        ):
-                            not_pit_cnt += 1
-                        if (
-                            self.cells[(x + self.kx[i], y + self.ky[i])].is_pit
-                            == CellValue.UNKNOWN
-                        ):
-                            self.cells[
-                                (x + self.kx[i], y + self.ky[i])
-                            ].is_pit = CellValue.MAYBE
-                            res[(x + self.kx[i], y + self.ky[i])] = self.cells[
-                                (x + self.kx[i], y + self.ky[i])
-                            ]
-                    if not_pit_cnt == 3:
-                        for i in range(4):
-                            if (
-                                self.cells[(x + self.kx[i], y + self.ky[i])].is_pit
-                                == CellValue.MAYBE
-                            ):
-                                self.cells[
-                                    (x + self.kx[i], y + self.ky[i])
-                                ].is_pit = CellValue.TRUE
-                                res[(x + self.kx[i], y + self.ky[i])] = self.cells[
-                                    (x + self.kx[i], y + self.ky[i])
-                                ]
-                if self.cells[(x, y)].is_breeze == CellValue.FALSE:
-                    for i in range(4):
-                        self.cells[
-                            (x + self.kx[i], y + self.ky[i])
-                        ].is_pit = CellValue.FALSE
-                        res[(x + self.kx[i], y + self.ky[i])] = self.cells[
-                            (x + self.kx[i], y + self.ky[i])
-                        ]
+        while self._worklist:
+            pos = self._worklist.popleft()
+            self._queued.discard(pos)
+            self._infer_at(pos[0], pos[1], res)
         return res
 
+    def _infer_at(self, x: int, y: int, res: Dict[Tuple[int, int], Any]) -> None:
+        cell = self.cells.get((x, y))
+        if cell is None or self.is_oob(x, y):
+            return
+        neighbours = [(x + self.kx[i], y + self.ky[i]) for i in range(4)]
+        if cell.is_empty == True:
+            for nx, ny in neighbours:
+                self._assign(nx, ny, "is_safe", True, res)
+        self._infer_percept(cell.get(Predicate.STENCH), Predicate.WUMPUS, neighbours, res)
+        self._infer_percept(cell.get(Predicate.BREEZE), Predicate.PIT, neighbours, res)
+
+    def _infer_percept(
+        self,
+        percept: CellValue,
+        predicate: Predicate,
+        neighbours: List[Tuple[int, int]],
+        res: Dict[Tuple[int, int], Any],
+    ) -> None:
+        """
+        Stench rules for the wumpus, breeze rules for the pits
+        """
+        if percept == CellValue.TRUE:
+            ruled_out_cnt = 0
+            for nx, ny in neighbours:
+                value = self[(nx, ny)].get(predicate)
+                if value == CellValue.FALSE:
+                    ruled_out_cnt += 1
+                if value == CellValue.UNKNOWN:
+                    self._assign(nx, ny, predicate, CellValue.MAYBE, res)
+            if ruled_out_cnt == 3:
+                for nx, ny in neighbours:
+                    if self[(nx, ny)].get(predicate) == CellValue.MAYBE:
+                        self._assign(nx, ny, predicate, CellValue.TRUE, res)
+        if percept == CellValue.FALSE:
+            for nx, ny in neighbours:
+                self._assign(nx, ny, predicate, CellValue.FALSE, res)
+
     def set_item(
-        self, pos: Tuple[int, int, str], cell: CellValue | bool
+        self, pos: Tuple[int, int, Predicate | str], cell: CellValue | bool
     ) -> Dict[Tuple[int, int], Any]:
-        x, y, attr = pos
-        res: Dict[Tuple[int, int], Any] = {}
-        self.cells[(x, y)].__setattr__(attr, cell)
+        return self.set_items([(pos, cell)])
+
+    def set_items(
+        self, items: List[Tuple[Tuple[int, int, Predicate | str], CellValue | bool]]
+    ) -> Dict[Tuple[int, int], Any]:
+        """
+        Assign every item first, then infer once from all of them
+
+        Returns:
+            Dict[Tuple[int, int], Any]: Assigned cells and cells changed by the inference
+        """
+        for (x, y, key), value in items:
+            if self.is_oob(x, y):
+                continue
+            if self._trail is not None:
+                self._trail.append(("cell", (x, y), self.cells[(x, y)].state()))
+            _write(self.cells[(x, y)], key, value)
+            self._index((x, y), self.cells[(x, y)])
+            self.mark_dirty(x, y)
         res = self.infer()
-        res[(x, y)] = self.cells[(x, y)]
+        for (x, y, _), _ in items:
+            if not self.is_oob(x, y):
+                res[(x, y)] = self.cells[(x, y)]
         return res
 
     def set_bound(self, direction: Direction, value: int) -> None:
+        """
+        Record a wall. Nothing beyond it is touched, lookups answer for those cells
+        """
+        self._record("bounds", None, (self.top, self.right, self.bottom, self.left))
         match direction:
             case Direction.UP:
-                for y in range(value + 1, 10):
-                    for x in range(-11, 10):
-                        self.cells[(x, y)].is_oob = True
+                self.top = value
+                on_bound = lambda x, y: y == value
             case Direction.RIGHT:
-                for y in range(-11, 10):
-                    for x in range(value + 1, 10):
-                        self.cells[(x, y)].is_oob = True
+                self.right = value
+                on_bound = lambda x, y: x == value
             case Direction.DOWN:
-                for y in range(-11, value - 1):
-                    for x in range(-11, 10):
-                        self.cells[(x, y)].is_oob = True
+                self.bottom = value
+                on_bound = lambda x, y: y == value
             case Direction.LEFT:
-                for y in range(-11, 10):
-                    for x in range(-11, value - 1):
-                        self.cells[(x, y)].is_oob = True
+                self.left = value
+                on_bound = lambda x, y: x == value
+        # Rules along the wall can now count the cells beyond it as ruled out
+        for x, y in self.sensed:
+            if on_bound(x, y) and (x, y) not in self._queued:
+                self._queued.add((x, y))
+                self._worklist.append((x, y))
+
+    def snapshot(self) -> int:
+        """
+        Start recording changes, if not already, and mark the current state
+
+        Returns:
+            int: Mark to give to restore
+        """
+        if self._trail is None:
+            self._trail = []
+        return len(self._trail)
+
+    def restore(self, mark: int) -> None:
+        """
+        Undo every change made since the snapshot that returned mark
+        """
+        trail = self._trail
+        while len(trail) > mark:
+            self._undo(*trail.pop())
+
+    def release(self) -> None:
+        """
+        Stop recording, the marks given so far cannot be restored anymore
+        """
+        self._trail = None
+
+    def _record(self, kind: str, a: Any, b: Any) -> None:
+        if self._trail is not None:
+            self._trail.append((kind, a, b))
+
+    def _undo(self, kind: str, a: Any, b: Any) -> None:
+        match kind:
+            case "cell":
+                cell = self.cells[a]
+                cell.restore(b)
+                self._index(a, cell)
+            case "dropped":
+                a.update(b)
+            case "bounds":
+                self.top, self.right, self.bottom, self.left = b
 
     # def set_bound(self, direction: Direction, value: int) -> Dict[Tuple[int, int], Any]:
     #     res: Dict[Tuple[int, int], Any] = {}
@@ -1,46 +1,100 @@
+from typing import Dict
+
+
 class Percepts:
-    def __init__(self) -> None:
-        self.percepts = [False, False, False, False, False]
+    """
+    Percepts of one step, packed in the bits of an int.
+
+    Immutable by default: with_percept returns a new value, so a Percepts can be
+    shared or kept in a trace without being copied. Pass frozen=False to fill one
+    in with the old item assignment, such a value cannot be hashed.
+    """
+
+    STENCH = 0
+    BREEZE = 1
+    GLITTER = 2
+    BUMP = 3
+    SCREAM = 4
+    NAMES = ("stench", "breeze", "glitter", "bump", "scream")
+
+    __slots__ = ("_bits", "_frozen")
+
+    def __init__(self, bits: int = 0, frozen: bool = True) -> None:
+        self._bits = bits
+        self._frozen = frozen
+
+    @property
+    def bits(self) -> int:
+        return self._bits
+
+    def has(self, index: int) -> bool:
+        return self.bits >> index & 1 == 1
+
+    def with_percept(self, index: int, value: bool = True) -> "Percepts":
+        if value:
+            return Percepts(self.bits | 1 << index)
+        return Percepts(self.bits & ~(1 << index))
+
+    @property
+    def stench(self) -> bool:
+        return self.bits & 1 << Percepts.STENCH != 0
+
+    @property
+    def breeze(self) -> bool:
+        return self.bits & 1 << Percepts.BREEZE != 0
+
+    @property
+    def glitter(self) -> bool:
+        return self.bits & 1 << Percepts.GLITTER != 0
+
+    @property
+    def bump(self) -> bool:
+        return self.bits & 1 << Percepts.BUMP != 0
+
+    @property
+    def scream(self) -> bool:
+        return self.bits & 1 << Percepts.SCREAM != 0
 
     def __getitem__(self, name: str) -> bool:
-        if name == "stench":
-            return self.percepts[0]
-        elif name == "breeze":
-            return self.percepts[1]
-        elif name == "glitter":
-            return self.percepts[2]
-        elif name == "bump":
-            return self.percepts[3]
-        elif name == "scream":
-            return self.percepts[4]
-        raise Exception(f"Unknown percept: {name}")
+        index = _INDEX.get(name)
+        if index is None:
+            raise Exception(f"Unknown percept: {name}")
+        return self.bits >> index & 1 == 1
 
     def __setitem__(self, name: str, value: bool):
-        if name == "stench":
-            self.percepts[0] = value
-        elif name == "breeze":
-            self.percepts[1] = value
-        elif name == "glitter":
-            self.percepts[2] = value
-        elif name == "bump":
-            self.percepts[3] = value
-        elif name == "scream":
-            self.percepts[4] = value
-        else:
+        if self._frozen:
+            raise TypeError("Percepts are immutable, use with_percept")
+        index = _INDEX.get(name)
+        if index is None:
             raise Exception(f"Unknown percept: {name}")
+        if value:
+            self._bits |= 1 << index
+        else:
+            self._bits &= ~(1 << index)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Percepts):
+            return NotImplemented
+        return self.bits == other.bits
+
+    def __hash__(self) -> int:
+        if not self._frozen:
+            raise TypeError("Percepts with frozen=False cannot be hashed")
+        return hash(self.bits)
+
+    def __copy__(self) -> "Percepts":
+        if self._frozen:
+            return self
+        return Percepts(self.bits, frozen=False)
+
+    def __deepcopy__(self, memo) -> "Percepts":
+        return self.__copy__()
 
     def __repr__(self) -> str:
-        names = ["none"] * 5
-        if self.percepts[0]:
-            names[0] = "stench"
-        if self.percepts[1]:
-            names[1] = "breeze"
-        if self.percepts[2]:
-            names[2] = "glitter"
-        if self.percepts[3]:
-            names[3] = "bump"
-        if self.percepts[4]:
-            names[4] = "scream"
+        names = [
+            name if self.bits >> i & 1 else "none" for i, name in enumerate(self.NAMES)
+        ]
         return f"Percepts({names})"
 
 
+_INDEX: Dict[str, int] = {name: i for i, name in enumerate(Percepts.NAMES)}
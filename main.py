@@ -61,7 +61,19 @@ def parse_args():
         type=int,
         help="map height",
     )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="run without a window",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="run the games across this many processes, needs --headless",
+    )
     args = parser.parse_args()
+    if args.workers is not None and not args.headless:
+        parser.error("--workers needs --headless")
     return args
 
 
@@ -93,6 +105,8 @@ def extract_args(args):
             "gold_count",
             "map_size",
             "initial_agent_pos",
+            "headless",
+            "workers",
         ],
     )
     return MapConfig(
@@ -104,6 +118,8 @@ def extract_args(args):
         gold_count,
         map_size,
         initial_agent_pos,
+        args.headless,
+        args.workers,
     )
 
 
@@ -120,4 +136,6 @@ if __name__ == "__main__":
         gold_count=config.gold_count,
         map_size=config.map_size,
         initial_agent_pos=config.initial_agent_pos,
+        headless=config.headless,
+        workers=config.workers,
     )
@@ -7,6 +7,35 @@ from lib.knowledge_base.knowledge_base import KnowledgeBase
 from rich import print
 
 
+def test_snapshot_restores_agent_board_and_kb():
+    board_data = read_board_data("tests/map1.txt")
+    board = BoardModelWithKB(board_data, KnowledgeBase())
+    agent = Agent(board=board)
+    snapshot = agent.snapshot()
+    safe = set(agent.safe_rooms(find_all=True))
+    known = set(board.known_tiles)
+    percepts = board.current_percepts
+    agent.take_action(Action.MOVE, (1, 0))
+    agent.take_action(Action.MOVE, (1, 1))
+    agent.take_action(Action.SHOOT, (1, 2))
+    assert board.points != 0
+    agent.restore(snapshot)
+    assert board.points == 0
+    assert board.virtual_agent_position() == (0, 0)
+    assert board.current_percepts == percepts
+    assert agent.stack == [(0, 0)]
+    assert set(agent.safe_rooms(find_all=True)) == safe
+    assert set(board.known_tiles) == known
+    assert board.kb.ask(1, 0, "is_stench") == CellValue.UNKNOWN
+    assert bytes(board._tiles) == bytes(read_board_data("tests/map1.txt").board_data.data)
+
+    agent.release()
+    agent.take_action(Action.MOVE, (1, 0))
+    assert board._trail is None
+    assert board._known_trail is None
+    assert board.kb.world._trail is None
+
+
 if __name__ == "__main__":
     board_data = read_board_data("tests/map1.txt")
     board = BoardModelWithKB(board_data, KnowledgeBase())
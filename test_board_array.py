@@ -0,0 +1,16 @@
+import numpy as np
+
+from lib.game import board_array
+from lib.game.board_data import TileType, read_board_data
+
+
+def test_put_enviroment_matches_python():
+    grids = [read_board_data(f"tests/map{i}.txt").board_data for i in (1, 2, 4)]
+    tiles = board_array.stack(grids)
+    assert board_array.check_enviroment(tiles).all()
+    bare = tiles & (board_array.WUMPUS | board_array.PIT | board_array.GOLD)
+    assert not board_array.check_enviroment(bare).any()
+    board_array.put_enviroment_array(bare)
+    assert np.array_equal(bare, tiles)
+    assert list(board_array.count_tiles(tiles, TileType.PIT)) == [3, 3, 1]
+    assert board_array.from_array(tiles[0]) == grids[0]
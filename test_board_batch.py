@@ -0,0 +1,40 @@
+import contextlib
+import copy
+import io
+import random
+
+import numpy as np
+
+from lib.game.board_batch import BatchBoardModel
+from lib.game.board_data import read_board_data
+from lib.game.board_model import Action, BoardModel, Direction, GameState
+
+
+def test_batch_scores_like_board_model():
+    boards = [read_board_data(f"tests/map{i}.txt") for i in range(1, 10)]
+    n = 6
+    rng = random.Random(3)
+    with contextlib.redirect_stdout(io.StringIO()):
+        batch = BatchBoardModel(boards, n)
+        models = [BoardModel(copy.deepcopy(boards[i])) for i in range(n)]
+        next_map = n
+        for _ in range(400):
+            actions = [rng.choice([1, 1, 1, 2, 3]) for _ in range(n)]
+            directions = [rng.choice([0, 1, 2, 3, 4]) for _ in range(n)]
+            result = batch.step(np.array(actions), np.array(directions))
+            for g, model in enumerate(models):
+                if directions[g]:
+                    model.change_agent_direction(Direction(directions[g]))
+                points = model.points
+                try:
+                    bits = model.act(Action(actions[g])).bits
+                except Exception:
+                    model.game_over = GameState.LOST_UNKNOWN
+                    bits = model.current_percepts.bits
+                assert result.states[g] == model.game_over.value
+                assert result.rewards[g] == model.points - points
+                assert sum(int(b) << i for i, b in enumerate(result.percepts[g])) == bits
+            for g in np.flatnonzero(result.done):
+                models[g] = BoardModel(copy.deepcopy(boards[next_map % len(boards)]))
+                next_map += 1
+    assert next_map > n
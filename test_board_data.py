@@ -0,0 +1,38 @@
+import contextlib
+import io
+
+import pytest
+
+from lib.game.board_data import (
+    format_board_data,
+    iter_board_data,
+    read_board_data,
+    write_board_data,
+)
+from lib.game.map_generator import generate_map
+
+
+def test_write_and_stream_maps(tmp_path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        boards = [generate_map(seed=seed).board_data for seed in range(5)]
+    boards.append(read_board_data("tests/map1.txt"))
+    filename = str(tmp_path / "maps.txt")
+    assert write_board_data(filename, boards) == 6
+    assert list(iter_board_data(filename)) == boards
+    assert read_board_data(filename) == boards[0]
+
+    maps = list(iter_board_data("tests"))
+    assert len(maps) == 9
+    assert maps[0] == read_board_data("tests/map1.txt")
+
+
+def test_write_rejects_maps_read_would_reject(tmp_path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        board = generate_map(seed=1, map_size=(4, 4), wumpus_count=0).board_data
+    filename = str(tmp_path / "maps.txt")
+    with pytest.raises(ValueError, match="No wumpus"):
+        write_board_data(filename, [board])
+
+    with open(filename, "w") as f:
+        f.write(format_board_data(read_board_data("tests/map2.txt")))
+    assert read_board_data(filename) == read_board_data("tests/map2.txt")
@@ -0,0 +1,96 @@
+import copy
+
+import pytest
+
+from lib.coord import CartesianCoord, DownwardCoord
+from lib.game.board_data import TileGrid, TileType, put_enviroment, read_board_data
+from lib.game.board_model import Action, BoardModel, Direction
+from lib.game.board_with_kb import BoardModelWithKB
+from lib.knowledge_base.knowledge_base import KnowledgeBase
+
+
+def _layer(board, tile_type):
+    return [[tile_type in tiles for tiles in row] for row in board]
+
+
+def test_shoot_removes_stench_around_wumpus():
+    # map3: agent at (4, 2) top-down, wumpuses at (2, 0) and (1, 3)
+    board_data = read_board_data("tests/map3.txt")
+    board_data.board_data[2][3].add(TileType.WUMPUS)
+    put_enviroment(board_data.board_data)
+    model = BoardModel(board_data)
+    model.change_agent_direction(Direction.LEFT)
+    percepts = model.act(Action.SHOOT)
+    assert percepts.scream
+    expected = copy.deepcopy(model.board)
+    for row in expected:
+        for tiles in row:
+            tiles.discard(TileType.STENCH)
+    put_enviroment(expected)
+    assert _layer(model.board, TileType.STENCH) == _layer(expected, TileType.STENCH)
+    assert not model.current_percepts.stench
+
+
+def test_tile_grid_matches_sets():
+    board_data = read_board_data("tests/map1.txt")
+    grid = board_data.board_data
+    assert isinstance(grid, TileGrid)
+    sets = [[set() for _ in range(grid.width)] for _ in range(grid.height)]
+    sets[0][3].add(TileType.PIT)
+    sets[1][0].add(TileType.WUMPUS)
+    sets[1][1].add(TileType.GOLD)
+    sets[1][2].add(TileType.PIT)
+    sets[3][2].add(TileType.PIT)
+    put_enviroment(sets)
+    assert grid.to_sets() == sets
+    assert TileGrid.from_sets(sets) == grid
+    assert grid[1][1] == {TileType.GOLD, TileType.STENCH, TileType.BREEZE}
+    copied = copy.deepcopy(grid)
+    copied[1][1].remove(TileType.GOLD)
+    assert TileType.GOLD in grid[1][1]
+
+
+def test_gold_is_sensed_once():
+    model = BoardModel(read_board_data("tests/map1.txt"))
+    for direction in (Direction.RIGHT, Direction.UP, Direction.UP):
+        model.change_agent_direction(direction)
+        percepts = model.act(Action.MOVE)
+    assert percepts.glitter
+    assert model.points == 1000 - 3 * 10
+    for direction in (Direction.DOWN, Direction.UP):
+        model.change_agent_direction(direction)
+        percepts = model.act(Action.MOVE)
+    assert not percepts.glitter
+    assert percepts.stench and percepts.breeze
+
+
+def test_coords_are_hashable_and_immutable():
+    for coord in (CartesianCoord(1, 2), DownwardCoord(1, 2)):
+        assert {coord: True}[(1, 2)]
+        assert hash(coord) == hash(type(coord)(1, 2))
+        with pytest.raises(AttributeError):
+            coord.x = 3
+    assert CartesianCoord(1, 2).to_downward(4).to_cartesian(4) == (1, 2)
+
+
+def test_virtual_agent_follows_moves_bumps_and_restores():
+    board = BoardModelWithKB(read_board_data("tests/map1.txt"), KnowledgeBase())
+
+    def move(direction):
+        board.change_agent_direction(direction)
+        board.act(Action.MOVE)
+        assert board.virtual_agent_position() == board._to_virtual(board._agent)
+
+    move(Direction.RIGHT)
+    assert board.virtual_agent_position() == (1, 0)
+    snapshot = board.snapshot()
+    move(Direction.LEFT)
+    assert board.virtual_agent_position() == (0, 0)
+    move(Direction.LEFT)
+    assert board.kb.left == 0
+    assert board.virtual_agent_position() == (0, 0)
+    board.restore(snapshot)
+    assert board.virtual_agent_position() == (1, 0)
+    assert board.virtual_agent_position() == board._to_virtual(board._agent)
+    move(Direction.UP)
+    assert board.virtual_agent_position() == (1, 1)
@@ -0,0 +1,61 @@
+import contextlib
+import io
+
+from lib.coord import DownwardCoord
+from lib.game.board_data import read_board_data, write_board_data
+from lib.game.engine import Engine, run_many
+from lib.game.map_generator import generate_map
+
+
+def test_engine_plays_to_the_end():
+    engine = Engine(read_board_data("tests/map1.txt"))
+    with contextlib.redirect_stdout(io.StringIO()):
+        game_result, points, golds = engine.run()
+    assert not engine.running
+    assert game_result in ("WON", "EATEN BY WUMPUS", "FELL INTO PIT")
+    assert points == engine.board_model.points
+    assert golds == engine.agent.golds
+
+
+def test_observer_stops_the_game():
+    engine = Engine(read_board_data("tests/map1.txt"))
+    texts = []
+
+    def observer(text):
+        texts.append(text)
+        return len(texts) < 3
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        game_result, _, _ = engine.run(observer)
+    assert engine.steps == 3
+    assert game_result == "LOST BY UNKNOWN REASON"
+
+
+def test_run_many_does_not_depend_on_workers():
+    results = run_many(6, map_path="tests/map2.txt", workers=1)
+    assert run_many(6, map_path="tests/map2.txt", workers=3) == results
+
+
+def test_run_many_bounds_the_steps():
+    results = run_many(2, map_path="tests/map1.txt", workers=1, max_steps=2)
+    assert [game_result for game_result, _, _ in results] == [
+        "LOST BY UNKNOWN REASON"
+    ] * 2
+
+
+def test_plays_a_map_larger_than_the_old_window(tmp_path):
+    filename = str(tmp_path / "big.txt")
+    with contextlib.redirect_stdout(io.StringIO()):
+        board = generate_map(
+            (16, 16), DownwardCoord(15, 0), wumpus_count=1, pit_count=0, gold_count=2, seed=3
+        ).board_data
+        write_board_data(filename, [board])
+        engine = Engine(read_board_data(filename))
+        farthest = 0
+        while engine.running and engine.steps < 3000:
+            engine.step()
+            x, y = engine.board_model.virtual_agent_position()
+            farthest = max(farthest, abs(x), abs(y))
+    assert engine.result()[0] == "WON"
+    # The exit is 15 rooms left and down of the start
+    assert farthest == 15
@@ -0,0 +1,65 @@
+import contextlib
+import io
+
+from lib.agent.agent import Agent
+from lib.agent.frontier import Frontier
+from lib.agent.navigation import Navigation
+from lib.game.board_data import read_board_data
+from lib.game.board_model import Action, Direction
+from lib.game.board_with_kb import BoardModelWithKB
+from lib.knowledge_base.cell import CellValue, Predicate
+from lib.knowledge_base.knowledge_base import KnowledgeBase
+
+
+def test_frontier_follows_tells_and_visits():
+    kb = KnowledgeBase()
+    navigation = Navigation(kb)
+    frontier = Frontier(navigation, (0, 0))
+    kb.world.set_bound(Direction.LEFT, 0)
+    kb.world.set_bound(Direction.DOWN, 0)
+    navigation.update([])
+    frontier.update([])
+    assert frontier.is_empty()
+
+    changes = kb.world.set_items(
+        [((x, y, "is_safe"), True) for x, y in [(0, 0), (1, 0), (3, 0), (0, 1)]]
+        + [((1, 1, Predicate.PIT), CellValue.MAYBE)]
+    )
+    navigation.update(changes)
+    frontier.update(changes)
+    assert frontier.unvisited == {(1, 0), (3, 0), (0, 1)}
+    assert frontier.risky == {(1, 1)}
+    assert sorted(frontier.adjacent_unvisited((0, 0))) == [(0, 1), (1, 0)]
+    assert frontier.adjacent_risky((1, 0)) == [(1, 1)]
+    # (3, 0) cannot be reached through safe rooms
+    assert frontier.nearest((0, 0)) in ((1, 0), (0, 1))
+    assert frontier.next_step((0, 0)) == frontier.nearest((0, 0))
+
+    frontier.visit((3, 0))
+    frontier.visit((1, 0))
+    assert frontier.nearest((1, 0)) == (0, 1)
+    assert frontier.next_step((1, 0)) == (0, 0)
+    frontier.visit((0, 1))
+    assert frontier.is_empty()
+    assert frontier.nearest((0, 0)) is None
+
+    frontier.restart((0, 1))
+    assert frontier.unvisited == {(0, 0), (1, 0), (3, 0)}
+    assert frontier.nearest((0, 1)) == (0, 0)
+
+
+def test_restore_brings_the_frontier_back():
+    with contextlib.redirect_stdout(io.StringIO()):
+        board = BoardModelWithKB(read_board_data("tests/map1.txt"), KnowledgeBase())
+        agent = Agent(board=board)
+        snapshot = agent.snapshot()
+        unvisited = set(agent.frontier.unvisited)
+        risky = set(agent.frontier.risky)
+        agent.take_action(Action.MOVE, (1, 0))
+        agent.take_action(Action.MOVE, (2, 0))
+        assert agent.frontier.unvisited != unvisited
+        agent.restore(snapshot)
+    assert agent.frontier.unvisited == unvisited
+    assert agent.frontier.risky == risky
+    assert agent.frontier.visited == {(0, 0)}
+    assert agent.navigation.to_target.sources == unvisited
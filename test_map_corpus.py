@@ -0,0 +1,19 @@
+import contextlib
+import io
+
+from lib.game.map_corpus import MapCorpus, build_corpus
+from lib.game.map_generator import generate_map
+
+
+def test_corpus_matches_generator(tmp_path):
+    filename = str(tmp_path / "maps.bin")
+    assert build_corpus(filename, range(10, 16), pit_count=3, workers=2) == 6
+    with MapCorpus(filename) as corpus:
+        assert len(corpus) == 6
+        for seed, board_data in zip(range(10, 16), corpus):
+            with contextlib.redirect_stdout(io.StringIO()):
+                map = generate_map(pit_count=3, seed=seed)
+            assert board_data == map.board_data
+            assert corpus.entries[seed - 10].pit_count == 3
+        assert corpus.by_seed(12) == corpus[2]
+        assert corpus[0].board_data is not corpus[0].board_data
@@ -1,10 +1,99 @@
+from collections import deque
+import contextlib
+import io
+import random
+
+import pytest
 from rich.table import Table
+from lib.coord import DownwardCoord
 from lib.game.board_data import TileType
-from lib.game.map_generator import generate_map
+from lib.game.map_generator import _critical_tiles, generate_map
 from rich import print
 from lib.game.board_data import print_map_debug
 
 
+def _reachable(map, start, exit_tile):
+    height, width = len(map), len(map[0])
+    seen = {start}
+    queue = deque([start])
+    while queue:
+        x, y = queue.popleft()
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if (
+                0 <= nx < width
+                and 0 <= ny < height
+                and (nx, ny) not in seen
+                and TileType.PIT not in map[ny][nx]
+            ):
+                seen.add((nx, ny))
+                queue.append((nx, ny))
+    return exit_tile in seen
+
+
+def test_critical_tiles_match_brute_force():
+    rng = random.Random(0)
+    for _ in range(200):
+        width, height = rng.randint(1, 6), rng.randint(1, 6)
+        map = [[set() for _ in range(width)] for _ in range(height)]
+        start = (rng.randrange(width), rng.randrange(height))
+        exit_tile = (0, height - 1)
+        for y in range(height):
+            for x in range(width):
+                if (x, y) not in (start, exit_tile) and rng.random() < 0.3:
+                    map[y][x].add(TileType.PIT)
+        critical, path = _critical_tiles(map, start, exit_tile)
+        if not _reachable(map, start, exit_tile):
+            assert critical == path == set()
+            continue
+        expected = set()
+        for y in range(height):
+            for x in range(width):
+                if (x, y) in (start, exit_tile) or TileType.PIT in map[y][x]:
+                    continue
+                map[y][x].add(TileType.PIT)
+                if not _reachable(map, start, exit_tile):
+                    expected.add((x, y))
+                map[y][x].discard(TileType.PIT)
+        assert critical == expected
+        assert {start, exit_tile} <= path
+        assert all(TileType.PIT not in map[y][x] for x, y in path)
+        assert critical <= path
+
+
+def test_pit_heavy_maps_keep_a_path_to_the_exit():
+    with contextlib.redirect_stdout(io.StringIO()):
+        for seed in range(30):
+            board = generate_map(
+                map_size=(7, 6), wumpus_count=1, pit_count=22, gold_count=1, seed=seed
+            ).board_data
+            grid = board.board_data
+            assert sum(TileType.PIT in tile for row in grid for tile in row) == 22
+            start = (board.initial_agent_pos.x, board.initial_agent_pos.y)
+            assert _reachable(grid, start, (0, board.height - 1))
+
+
+def test_same_seed_same_map():
+    with contextlib.redirect_stdout(io.StringIO()):
+        first = generate_map(map_size=(9, 7), seed=42)
+        second = generate_map(map_size=(9, 7), seed=42)
+        other = generate_map(map_size=(9, 7), seed=43)
+    assert first == second
+    assert first.board_data != other.board_data
+
+
+def test_infeasible_counts_raise():
+    agent = DownwardCoord(2, 0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        # 3x1: the only tile between the agent and the exit
+        with pytest.raises(ValueError, match="cutting the agent from the exit"):
+            generate_map((3, 1), agent, wumpus_count=0, pit_count=1, gold_count=0)
+        with pytest.raises(ValueError, match="wumpus and"):
+            generate_map((3, 1), agent, wumpus_count=1, pit_count=1, gold_count=0)
+        with pytest.raises(ValueError, match="objects"):
+            generate_map((3, 1), agent, wumpus_count=1, pit_count=0, gold_count=2)
+        generate_map((3, 1), agent, wumpus_count=1, pit_count=0, gold_count=1)
+
+
 def main():
     map = generate_map(
         map_size=None,
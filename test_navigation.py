@@ -0,0 +1,67 @@
+import contextlib
+import io
+
+from lib.agent.agent import Agent
+from lib.agent.navigation import Navigation
+from lib.game.board_data import read_board_data
+from lib.game.board_model import Action, Direction
+from lib.game.board_with_kb import BoardModelWithKB
+from lib.knowledge_base.knowledge_base import KnowledgeBase
+
+
+def _tell_safe(kb, navigation, rooms):
+    changes = kb.world.set_items([((x, y, "is_safe"), True) for x, y in rooms])
+    navigation.update(changes)
+
+
+def test_distance_to_exit_follows_new_safe_rooms():
+    kb = KnowledgeBase()
+    navigation = Navigation(kb)
+    kb.world.set_bound(Direction.LEFT, 0)
+    kb.world.set_bound(Direction.DOWN, 0)
+    # A detour from (2, 2) to the exit (0, 0) through the right column
+    _tell_safe(kb, navigation, [(0, 0), (1, 0), (2, 0), (2, 1), (2, 2), (1, 2)])
+    assert navigation.distance[(1, 2)] == 5
+    assert navigation.next_to_exit((2, 2)) == (2, 1)
+
+    # A shortcut through (1, 1) shortens the paths without a rebuild
+    _tell_safe(kb, navigation, [(1, 1)])
+    assert navigation.distance[(1, 2)] == 3
+    assert navigation.next_to_exit((1, 2)) == (1, 1)
+    assert navigation.next_to_exit((0, 0)) == (0, 0)
+
+    rebuilt = Navigation(kb)
+    rebuilt.update([])
+    assert rebuilt.distance == navigation.distance
+
+
+def test_next_to_nearest_target():
+    kb = KnowledgeBase()
+    navigation = Navigation(kb)
+    _tell_safe(kb, navigation, [(0, 0), (1, 0), (2, 0), (0, 1), (0, 2)])
+    navigation.add_targets([(2, 0), (0, 2)])
+    assert navigation.next_to_target((0, 0)) in ((1, 0), (0, 1))
+    assert navigation.next_to_target((1, 0)) == (2, 0)
+
+    # Only the paths that ended at (2, 0) get longer
+    navigation.remove_targets([(2, 0)])
+    assert navigation.to_target.distance[(1, 0)] == 3
+    assert navigation.to_target.distance[(0, 1)] == 1
+    assert navigation.next_to_target((1, 0)) == (0, 0)
+    navigation.remove_targets([(0, 2)])
+    assert navigation.next_to_target((0, 0)) is None
+
+
+def test_restore_drops_rooms_proved_safe_after_the_snapshot():
+    with contextlib.redirect_stdout(io.StringIO()):
+        board = BoardModelWithKB(read_board_data("tests/map1.txt"), KnowledgeBase())
+        agent = Agent(board=board)
+        snapshot = agent.snapshot()
+        safe = set(agent.navigation.safe)
+        distance = dict(agent.navigation.distance)
+        agent.take_action(Action.MOVE, (1, 0))
+        agent.take_action(Action.MOVE, (2, 0))
+        assert agent.navigation.safe != safe
+        agent.restore(snapshot)
+    assert agent.navigation.safe == safe == set(board.kb.safe_cells)
+    assert agent.navigation.distance == distance
@@ -0,0 +1,31 @@
+import pytest
+
+from lib.percepts import Percepts
+
+
+def test_percepts_bits():
+    percepts = Percepts(1 << Percepts.STENCH)
+    assert percepts["stench"] and percepts.stench
+    assert not percepts["bump"]
+    bumped = percepts.with_percept(Percepts.BUMP)
+    assert bumped.bump and bumped.stench
+    # The original value is left untouched
+    assert not percepts.bump
+    with pytest.raises(TypeError):
+        percepts["bump"] = True
+    with pytest.raises(AttributeError):
+        percepts.bump = True
+    with pytest.raises(AttributeError):
+        percepts.bits = 0
+    assert percepts.bits == 1 << Percepts.STENCH
+    assert {percepts: True}[Percepts(1 << Percepts.STENCH)]
+
+
+def test_unfrozen_percepts():
+    percepts = Percepts(frozen=False)
+    percepts["breeze"] = True
+    assert percepts.bits == 1 << Percepts.BREEZE
+    with pytest.raises(AttributeError):
+        percepts.bits = 0
+    with pytest.raises(TypeError):
+        hash(percepts)
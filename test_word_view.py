@@ -1,5 +1,12 @@
-from lib.knowledge_base.cell import CellValue
+import numpy as np
+
+from lib.game.board_model import Action, Direction
+from lib.knowledge_base.cell import Cell, CellValue, Predicate
+from lib.knowledge_base.batch import BatchWorldView
+from lib.knowledge_base.bitboard import BitboardWorldView
+from lib.knowledge_base.knowledge_base import KnowledgeBase
 from lib.knowledge_base.world_view import WorldData, WorldView
+from lib.percepts import Percepts
 from rich import print
 
 def test_world_data():
@@ -8,6 +15,42 @@ def test_world_data():
     data[(0, 0)].is_breeze = CellValue.TRUE
     print(data[(0, 0)])
 
+
+def test_cell_implications():
+    cell = Cell()
+    cell.set(Predicate.WUMPUS, CellValue.TRUE)
+    assert cell.get(Predicate.PIT) == CellValue.FALSE
+    assert cell.is_gold == CellValue.FALSE
+    cell.is_pit = CellValue.TRUE
+    assert cell.is_wumpus == CellValue.FALSE
+    assert not hasattr(cell, "__dict__")
+
+
+
+def test_world_data_grows_across_chunks():
+    data = WorldView()
+    # Far outside the old -11..9 window, on both sides of chunk edges
+    centres = [(-1, -1), (7, 8), (-8, -9), (-17, 40), (1000, -1000)]
+    for x, y in centres:
+        data.set_item((x, y, "is_breeze"), CellValue.TRUE)
+    for x, y in centres:
+        assert data[(x, y)].is_breeze == CellValue.TRUE
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            assert data[(nx, ny)].is_pit == CellValue.MAYBE
+    # Three ruled out neighbours across a chunk edge pin the pit
+    data.set_item((1000, -999, "is_pit"), CellValue.FALSE)
+    data.set_item((1000, -1001, "is_pit"), CellValue.FALSE)
+    data.set_item((999, -1000, "is_pit"), CellValue.FALSE)
+    assert data[(1001, -1000)].is_pit == CellValue.TRUE
+    assert data[(500, 500)].is_pit == CellValue.UNKNOWN
+
+    cells = data.cells
+    assert cells.get((-5000, 5000)) is None
+    positions = {pos for pos, _ in cells.items()}
+    assert {(1001, -1000), (-17, 41), (-9, -9)} <= positions
+    assert len(positions) == len(cells.chunks) * cells.chunk_size**2
+
+
 def test_breeze():
     data = WorldView()
     data.set_item((0, 0, "is_breeze"), CellValue.TRUE)
@@ -27,5 +70,165 @@ def test_breeze():
     assert data[(-1, 0)].is_pit == CellValue.TRUE
 
 
+def test_incremental_fixpoint():
+    data = WorldView()
+    data.set_item((0, 0, "is_breeze"), CellValue.TRUE)
+    data.set_item((0, -1, "is_pit"), CellValue.FALSE)
+    data.set_item((0, 1, "is_pit"), CellValue.FALSE)
+    res = data.set_item((1, 0, "is_pit"), CellValue.FALSE)
+    # The breeze rule at (0, 0) reads (1, 0), so it is re-evaluated right away
+    assert data[(-1, 0)].is_pit == CellValue.TRUE
+    assert (-1, 0) in res
+    assert (5, 5) not in res
+
+
+def test_bitboard_matches_world_view():
+    facts = [
+        (0, 0, "is_safe", True),
+        (0, 0, "is_stench", CellValue.TRUE),
+        (0, 0, "is_breeze", CellValue.FALSE),
+        (1, 0, "is_safe", True),
+        (1, 0, "is_stench", CellValue.FALSE),
+        (1, 0, "is_breeze", CellValue.TRUE),
+        (0, -1, "is_safe", True),
+        (0, -1, "is_stench", CellValue.FALSE),
+        (0, -1, "is_breeze", CellValue.FALSE),
+        (-1, 0, "is_safe", True),
+        (-1, 0, "is_stench", CellValue.FALSE),
+        (-1, 0, "is_breeze", CellValue.FALSE),
+    ]
+    data = WorldView()
+    bitboard = BitboardWorldView()
+    for x, y, attr, value in facts:
+        data.set_item((x, y, attr), value)
+        bitboard.set_item((x, y, attr), value)
+    for y in range(-3, 4):
+        for x in range(-3, 4):
+            assert repr(data[(x, y)]) == repr(bitboard[(x, y)])
+    assert bitboard[(0, 1)].is_wumpus == CellValue.TRUE
+    assert bitboard[(0, 1)].is_pit == CellValue.FALSE
+
+
+def test_bound_is_lazy():
+    data = WorldView()
+    data.set_item((0, 0, "is_breeze"), CellValue.TRUE)
+    data.set_bound(Direction.UP, 0)
+    data.set_item((1, 0, "is_pit"), CellValue.FALSE)
+    data.set_item((0, -1, "is_pit"), CellValue.FALSE)
+    # (0, 1) is beyond the wall, so the breeze can only come from (-1, 0)
+    assert data[(-1, 0)].is_pit == CellValue.TRUE
+    assert data[(0, 1)].is_pit == CellValue.FALSE
+    assert data.in_bounds(data.pit[CellValue.MAYBE]) == []
+    assert (0, 1) not in data.pit[CellValue.MAYBE]
+
+
+def test_batch_matches_world_view():
+    facts = [
+        [(0, 0, "is_safe", True), (0, 0, "is_stench", CellValue.TRUE)],
+        [(0, 0, "is_safe", True), (0, 0, "is_breeze", CellValue.TRUE)],
+        [(0, 0, "is_safe", True), (0, 0, "is_breeze", CellValue.FALSE)],
+    ]
+    for game in facts:
+        game += [
+            (1, 0, "is_safe", True),
+            (1, 0, "is_stench", CellValue.FALSE),
+            (1, 0, "is_breeze", CellValue.FALSE),
+            (0, -1, "is_pit", CellValue.FALSE),
+        ]
+    views = [WorldView() for _ in facts]
+    batch = BatchWorldView(len(facts))
+    views[1].set_bound(Direction.UP, 0)
+    batch.set_bound(np.array([1]), Direction.UP, np.array([0]))
+    for game, (view, items) in enumerate(zip(views, facts)):
+        view.set_items([((x, y, attr), value) for x, y, attr, value in items])
+        for x, y, attr, value in items:
+            batch.assign(np.array([game]), np.array([x]), np.array([y]), attr, value)
+    batch.infer()
+    for game, view in enumerate(views):
+        for y in range(-3, 4):
+            for x in range(-3, 4):
+                assert view[(x, y)].state() == batch.state(game, x, y)
+    assert batch.state(1, -1, 0)[Predicate.PIT] == CellValue.TRUE
+
+
+def _scan(kb):
+    """
+    safe_cells, wumpus_cells and pit_cells from a walk over every stored cell
+    """
+    safe, wumpus, pit = set(), set(), set()
+    for pos, cell in kb.world.cells.items():
+        if kb.world.is_oob(pos[0], pos[1]):
+            continue
+        if cell.is_safe:
+            safe.add(pos)
+        for value in (CellValue.TRUE, CellValue.MAYBE):
+            if cell.is_wumpus == value:
+                wumpus.add((pos, value))
+            if cell.is_pit == value:
+                pit.add((pos, value))
+    return safe, wumpus, pit
+
+
+def test_indexes_match_a_full_scan():
+    kb = KnowledgeBase()
+    stench = 1 << Percepts.STENCH
+    breeze = 1 << Percepts.BREEZE
+    bump = 1 << Percepts.BUMP
+    tells = [
+        (0, 0, stench | breeze, None),
+        (1, 0, 0, (Action.MOVE, Direction.RIGHT)),
+        (1, -1, 0, (Action.MOVE, Direction.DOWN)),
+        (1, -1, bump, (Action.MOVE, Direction.DOWN)),
+        (0, -1, breeze, (Action.MOVE, Direction.LEFT)),
+        (0, -1, breeze, (Action.SHOOT, Direction.LEFT)),
+        (1, 1, stench, (Action.MOVE, Direction.UP)),
+    ]
+    for x, y, bits, action in tells:
+        kb.tell(x, y, Percepts(bits), action)
+        if (x, y) == (1, 0):
+            assert ((0, -1), CellValue.MAYBE) in kb.pit_cells
+        if (x, y) == (1, -1):
+            # The clean room next to it rules the pit out
+            assert kb.ask(0, -1, Predicate.PIT) == CellValue.FALSE
+        safe, wumpus, pit = _scan(kb)
+        assert set(kb.safe_cells) == safe
+        assert set(kb.wumpus_cells) == wumpus
+        assert set(kb.pit_cells) == pit
+    assert kb.bottom == -1
+
+
+def test_tell_matches_facts_one_at_a_time():
+    stench_breeze = 1 << Percepts.STENCH | 1 << Percepts.BREEZE
+    batched, single = KnowledgeBase(), KnowledgeBase()
+    for kb in (batched, single):
+        kb.tell(0, 0, Percepts(stench_breeze))
+        kb.tell(1, 0, Percepts(0), (Action.MOVE, Direction.RIGHT))
+        kb.tell(0, 0, Percepts(stench_breeze), (Action.MOVE, Direction.LEFT))
+    # Moving up from (0, 0) bumps into the top wall
+    changes = batched.tell(
+        0, 0, Percepts(stench_breeze | 1 << Percepts.BUMP), (Action.MOVE, Direction.UP)
+    )
+    single.world.set_bound(Direction.UP, 0)
+    for fact in [
+        ((0, 0, "is_safe"), True),
+        ((0, 0, Predicate.STENCH), CellValue.TRUE),
+        ((0, 0, Predicate.BREEZE), CellValue.TRUE),
+        ((0, 0, Predicate.GOLD), CellValue.FALSE),
+    ]:
+        single.world.set_item(*fact)
+    assert batched.top == single.top == 0
+    for y in range(-3, 4):
+        for x in range(-3, 4):
+            assert batched.world[(x, y)].state() == single.world[(x, y)].state()
+    assert set(batched.safe_cells) == set(single.safe_cells)
+    assert set(batched.wumpus_cells) == set(single.wumpus_cells)
+    assert set(batched.pit_cells) == set(single.pit_cells)
+    # The wall leaves (-1, 0) and (0, -1) for the wumpus and the pit
+    assert batched.ask(0, 1, Predicate.WUMPUS) == CellValue.FALSE
+    assert batched.ask(-1, 0, Predicate.WUMPUS) == CellValue.MAYBE
+    assert batched.ask(0, -1, Predicate.PIT) == CellValue.MAYBE
+    assert (0, 0) in changes
+
+
 if __name__ == '__main__':
     test_breeze()
\ No newline at end of file